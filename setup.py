@@ -3,8 +3,23 @@ This is a setup.py script generated by py2applet
 
 Usage:
     python setup.py py2app
+
+py2app must already be installed: python3 -m pip install -r requirements.txt
 """
 
+import copyreg
+import glob
+import hashlib
+import importlib.metadata
+import marshal
+import os
+import pickle
+import plistlib
+import subprocess
+import sys
+import types
+
+from py2app.build_app import py2app as py2app_build
 from setuptools import setup
 
 # The version number; do not change this manually! It is updated by bumpversion (https://github.com/c4urself/bump2version)
@@ -13,19 +28,28 @@ __version__ = "0.10.1"
 # The file that contains the main application
 APP = ["src/textinator.py"]
 
-# Include additional python modules here; probably not the best way to do this
-# but I couldn't figure out how else to get py2app to include modules in the src/ folder
+# Modules in the src/textinator_pkg package are found by py2app's module finder
+# and byte-compiled into the bundle; src/ must be on the path for this to work
+sys.path.insert(0, "src")
+
+# Include additional resources here; python modules belong in the textinator_pkg package
 DATA_FILES = [
-    "src/appkitgui.py",
-    "src/confirmation_window.py",
     "src/icon.png",
     "src/icon_paused.png",
-    "src/loginitems.py",
-    "src/macvision.py",
-    "src/pasteboard.py",
-    "src/utils.py",
 ]
 
+
+def build_number() -> str:
+    """Return the number of commits in the git history to use as the build number,
+    or __version__ if this isn't a git checkout"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-list", "--count", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return __version__
+
+
 # These values will be included by py2app into the Info.plist file in the App bundle
 # See https://developer.apple.com/documentation/bundleresources/information_property_list?language=objc
 # for more information
@@ -34,8 +58,9 @@ PLIST = {
     "LSUIElement": True,
     # CFBundleShortVersionString is the version number that appears in the App's About box
     "CFBundleShortVersionString": __version__,
-    # CFBundleVersion is the build version (here we use the same value as the short version)
-    "CFBundleVersion": __version__,
+    # CFBundleVersion is the build version; this is the git commit count so it increases
+    # with every commit independently of the version number shown to the user
+    "CFBundleVersion": build_number(),
     # NSDesktopFolderUsageDescription is the message that appears when the app asks for permission to access the Desktop folder
     # Likewise for NSDocumentsFolderUsageDescription and NSDownloadsFolderUsageDescription
     "NSDesktopFolderUsageDescription": "Textinator needs access to your Desktop folder to detect new screenshots. "
@@ -61,17 +86,150 @@ PLIST = {
     ],
 }
 
+# The serialized PLIST is cached here and only rewritten when PLIST changes
+# so that rebuilds produce a byte-identical Info.plist
+PLIST_CACHE = "build/Info.plist.cached"
+
+
+def cached_plist(plist: dict, path: str) -> str:
+    """Write plist to path if the file doesn't already contain it and return path"""
+    data = plistlib.dumps(plist)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
 # Options for py2app
 OPTIONS = {
     # The icon file to use for the app (this is App icon in Finder, not the status bar icon)
     "iconfile": "icon.icns",
-    "plist": PLIST,
+    # py2app accepts either a dict or the path to a plist file
+    "plist": cached_plist(PLIST, PLIST_CACHE),
+    # byte-compile everything at build time with -OO (strips asserts and docstrings)
+    # so the app never has to parse source on launch
+    "optimize": 2,
+    # store the bundled python modules in a zip file instead of thousands of loose files
+    "compressed": True,
+    # bundle a full copy of python and its standard library
+    "semi_standalone": False,
+    # only import from the modules bundled in the app: don't add the system site-packages
+    # or $PYTHONPATH to sys.path, which would add directories to scan on every import
+    "site_packages": False,
+    "use_pythonpath": False,
+    # the PyObjC frameworks used by the app; py2app still scans every import but these are
+    # listed to make sure they're bundled: Vision is only reachable indirectly through
+    # textinator_pkg.macvision rather than from the main script
+    "includes": ["objc", "Foundation", "AppKit", "Quartz", "Vision"],
+    # standard library packages that Textinator doesn't use; excluding them keeps the bundle small
+    "excludes": [
+        "test",
+        "unittest",
+        "tkinter",
+        "turtle",
+        "idlelib",
+        "pydoc_data",
+        "lib2to3",
+        "ensurepip",
+        "distutils",
+        "pip",
+        "setuptools",
+        "xmlrpc",
+        "curses",
+        "pydoc",
+        "email.test",
+        "sqlite3.test",
+        "multiprocessing.tests",
+        "asyncio.test",
+    ],
+    # don't copy any additional frameworks into the bundle
+    "frameworks": [],
+    # the app's own support modules
+    "packages": ["textinator_pkg"],
+    # argv emulation runs an event loop at launch waiting for files opened with the app;
+    # Textinator receives files via the Services menu so it doesn't need this
+    "argv_emulation": False,
+    # the app doesn't use the user's shell environment so don't run a login shell at launch to get it
+    "emulate_shell_environment": False,
 }
 
+# Set TEXTINATOR_DEV=1 in the environment to build the app in alias mode for development;
+# alias mode symlinks the source files into the app bundle instead of copying them
+# so rebuilding the app is nearly instant
+DEV = os.environ.get("TEXTINATOR_DEV")
+if DEV:
+    OPTIONS["alias"] = True
+
+
+# py2app's module dependency graph is cached here between builds; the cache key covers the
+# sources, python version, sys.path and installed package versions so the cache only needs to be
+# deleted (or the build directory removed) to force a full scan after changes the key can't see
+MODULEFINDER_CACHE = "build/modulefinder.cache"
+
+
+def _pickle_code(code: types.CodeType):
+    """Pickle code objects in the module graph with marshal, which pickle can't do itself"""
+    return marshal.loads, (marshal.dumps(code),)
+
+
+class BuildApp(py2app_build):
+    """py2app command that caches the module graph between builds"""
+
+    def modulefinder_cache_key(self) -> str:
+        """Return a key that changes whenever the module graph might change"""
+        key = hashlib.sha256()
+        for path in sorted(glob.glob("src/**/*.py", recursive=True)):
+            stat = os.stat(path)
+            key.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+        key.update(sys.version.encode())
+        # upgrading an installed package (e.g. pyobjc or rumps) can change the graph
+        # without changing any of the sources
+        for requirement in sorted(
+            f"{dist.metadata['Name']}=={dist.version}"
+            for dist in importlib.metadata.distributions()
+        ):
+            key.update(f"{requirement}\n".encode())
+        for value in (sys.path, self.includes, self.packages, self.excludes):
+            key.update(repr(sorted(map(str, value))).encode())
+        return key.hexdigest()
+
+    def get_modulefinder(self):
+        """Return the module graph from the cache if the sources haven't changed,
+        otherwise build it and update the cache"""
+        key = self.modulefinder_cache_key()
+        try:
+            with open(MODULEFINDER_CACHE, "rb") as f:
+                if pickle.load(f) == key:
+                    return pickle.load(f)
+        except Exception:
+            # missing or unreadable cache, build the graph from scratch
+            pass
+
+        mf = super().get_modulefinder()
+        try:
+            os.makedirs(os.path.dirname(MODULEFINDER_CACHE), exist_ok=True)
+            with open(MODULEFINDER_CACHE, "wb") as f:
+                # the key is pickled separately so a stale graph is never unpickled
+                pickle.dump(key, f, pickle.HIGHEST_PROTOCOL)
+                pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+                pickler.dispatch_table = copyreg.dispatch_table.copy()
+                pickler.dispatch_table[types.CodeType] = _pickle_code
+                pickler.dump(mf)
+        except Exception:
+            # the graph couldn't be cached; don't leave a partial cache behind
+            if os.path.exists(MODULEFINDER_CACHE):
+                os.remove(MODULEFINDER_CACHE)
+        return mf
+
+
 setup(
     app=APP,
     data_files=DATA_FILES,
     name="Textinator",
     options={"py2app": OPTIONS},
-    setup_requires=["py2app"],
+    cmdclass={"py2app": BuildApp},
 )
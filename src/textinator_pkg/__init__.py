@@ -0,0 +1 @@
+"""Support modules for Textinator; bundled by py2app as a regular package so they are byte-compiled"""
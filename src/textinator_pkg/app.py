@@ -0,0 +1,908 @@
+"""Simple MacOS menu bar / status bar app that automatically perform text detection on screenshots.
+
+Also detects text on clipboard images and image files via the Services menu.
+
+Runs on Catalina (10.15) and later.
+"""
+
+# On Python 3.15+ (PEP 810) imports of these modules are deferred until first use;
+# older versions of Python ignore this
+__lazy_modules__ = ["textinator_pkg.loginitems"]
+
+import concurrent.futures
+import contextlib
+import datetime
+import functools
+import os
+import plistlib
+import typing as t
+
+import objc
+import rumps
+from AppKit import (
+    NSApplication,
+    NSPasteboardTypeFileURL,
+    NSWorkspace,
+    NSWorkspaceDidActivateApplicationNotification,
+)
+from Foundation import (
+    NSURL,
+    NSData,
+    NSLog,
+    NSMetadataQuery,
+    NSMetadataQueryDidFinishGatheringNotification,
+    NSMetadataQueryDidStartGatheringNotification,
+    NSMetadataQueryDidUpdateNotification,
+    NSMetadataQueryGatheringProgressNotification,
+    NSNotificationCenter,
+    NSObject,
+    NSPredicate,
+    NSRunLoop,
+    NSRunLoopCommonModes,
+    NSTimer,
+)
+from PyObjCTools import AppHelper
+
+from textinator_pkg.confirmation_window import ConfirmationWindow
+from textinator_pkg.loginitems import (
+    add_login_item,
+    list_login_items,
+    remove_login_item,
+)
+from textinator_pkg.macvision import (
+    ciimage_from_data,
+    ciimage_from_file,
+    ciimage_from_url,
+    detect_text_and_qrcodes_in_ciimage_async,
+    detect_text_in_ciimage_async,
+    get_supported_vision_languages,
+)
+from textinator_pkg.pasteboard import TIFF, Pasteboard
+from textinator_pkg.utils import (
+    get_app_path,
+    get_screenshot_location,
+    verify_directory_access,
+)
+
+if t.TYPE_CHECKING:
+    # Quartz is only needed here for annotations; CIImages are created by textinator_pkg.macvision
+    import Quartz
+
+# do not manually change the version; use bump2version per the README
+__version__ = "0.10.1"
+
+APP_NAME = "Textinator"
+APP_ICON = "icon.png"
+APP_ICON_PAUSED = "icon_paused.png"
+
+# default confidence threshold for text detection
+CONFIDENCE = {"LOW": 0.3, "MEDIUM": 0.5, "HIGH": 0.8}
+CONFIDENCE_DEFAULT = "LOW"
+
+# default language for text detection
+LANGUAGE_DEFAULT = "en-US"
+LANGUAGE_ENGLISH = "en-US"
+
+# where to store saved state, will reside in Application Support/APP_NAME
+CONFIG_FILE = f"{APP_NAME}.plist"
+
+# optional logging to file if debug enabled (will always log to Console via NSLog)
+LOG_FILE = f"{APP_NAME}.log"
+
+# how often (in seconds) to check for new screenshots on the clipboard
+CLIPBOARD_CHECK_INTERVAL = 2
+
+# while the clipboard doesn't change, the interval is multiplied by CLIPBOARD_CHECK_BACKOFF
+# after each check up to CLIPBOARD_CHECK_INTERVAL_MAX seconds
+CLIPBOARD_CHECK_BACKOFF = 1.5
+CLIPBOARD_CHECK_INTERVAL_MAX = 4
+
+
+class Textinator(rumps.App):
+    """MacOS Menu Bar App to automatically perform text detection on screenshots."""
+
+    def __init__(self, *args, **kwargs):
+        super(Textinator, self).__init__(*args, **kwargs)
+
+        # set "debug" to true in the config file to enable debug logging
+        self._debug = False
+
+        # pause / resume text detection
+        self._paused = False
+
+        # confidence threshold for detected text; updated when the confidence menu state changes
+        self._confidence_value = CONFIDENCE[CONFIDENCE_DEFAULT]
+
+        # languages passed to text detection; updated when the language settings change
+        self._active_languages = (LANGUAGE_DEFAULT,)
+
+        # set the icon to a PNG file in the current directory
+        # this immediately updates the menu bar icon
+        # py2app will place the icon in the app bundle Resources folder
+        self.icon = APP_ICON
+
+        # ensure icon matches menu bar dark/light state
+        self.template = True
+
+        # the log method uses NSLog to log to the unified log
+        self.log("started")
+
+        # get list of supported languages for language menu
+        languages, _ = get_supported_vision_languages()
+        languages = languages or [LANGUAGE_DEFAULT]
+        self.log(f"supported languages: {languages}")
+        self.recognition_language = (
+            LANGUAGE_DEFAULT if LANGUAGE_DEFAULT in languages else languages[0]
+        )
+
+        # menus
+        self.confidence = rumps.MenuItem("Text Detection Confidence Threshold")
+        self.confidence_low = rumps.MenuItem("Low", self.on_confidence)
+        self.confidence_medium = rumps.MenuItem("Medium", self.on_confidence)
+        self.confidence_high = rumps.MenuItem("High", self.on_confidence)
+        self.language = rumps.MenuItem("Text Recognition Language")
+        # language menu items by language and the currently checked item
+        self._language_items = {}
+        self._language_item = None
+        for language in languages:
+            self._language_items[language] = rumps.MenuItem(language, self.on_language)
+            self.language.add(self._language_items[language])
+        self.language_english = rumps.MenuItem("Always Detect English", self.on_toggle)
+        self.detect_clipboard = rumps.MenuItem(
+            "Detect Text in Images on Clipboard", self.on_toggle
+        )
+        self.qrcodes = rumps.MenuItem("Detect QR Codes", self.on_toggle)
+        self.pause = rumps.MenuItem("Pause Text Detection", self.on_pause)
+        self.show_notification = rumps.MenuItem("Notification", self.on_toggle)
+        self.linebreaks = rumps.MenuItem("Keep Linebreaks", self.on_toggle)
+        self.append = rumps.MenuItem("Append to Clipboard", self.on_toggle)
+        self.clear_clipboard = rumps.MenuItem(
+            "Clear Clipboard", self.on_clear_clipboard
+        )
+        self.confirmation = rumps.MenuItem("Confirm Clipboard Changes", self.on_toggle)
+        self.show_last_detetection = rumps.MenuItem(
+            "Show Last Text Detection", self.on_show_last_detection
+        )
+        self.start_on_login = rumps.MenuItem(
+            f"Start {APP_NAME} on Login", self.on_start_on_login
+        )
+        self.about = rumps.MenuItem(f"About {APP_NAME}", self.on_about)
+        self.quit = rumps.MenuItem(f"Quit {APP_NAME}", self.on_quit)
+        self.menu = [
+            [
+                self.confidence,
+                [self.confidence_low, self.confidence_medium, self.confidence_high],
+            ],
+            self.language,
+            self.language_english,
+            self.detect_clipboard,
+            self.pause,
+            None,
+            self.qrcodes,
+            None,
+            self.show_notification,
+            None,
+            self.linebreaks,
+            self.append,
+            self.clear_clipboard,
+            self.confirmation,
+            self.show_last_detetection,
+            None,
+            self.start_on_login,
+            self.about,
+            self.quit,
+        ]
+
+        # load config from plist file and init menu state
+        self.load_config()
+
+        # set icon to auto switch between light and dark mode
+        self.template = True
+
+        # track all screenshots already seen by their Spotlight path and,
+        # for screenshots found after startup, by their (device, inode) pair
+        self._seen_paths = set()
+        self._seen_files = set()
+
+        # Need to verify access to the screenshot folder; default is ~/Desktop
+        # When this is called for the first time, the user will be prompted to grant access
+        # and shown the message assigned to NSDesktopFolderUsageDescription in the Info.plist file
+        self.verify_screenshot_access()
+
+        # initialize the service provider class which handles actions from the Services menu
+        # pass reference to self so the service provider can access the app's methods and state
+        self.service_provider = ServiceProvider.alloc().initWithApp_(self)
+        # register the service provider with the Services menu
+        NSApplication.sharedApplication().setServicesProvider_(self.service_provider)
+
+        # Create a Pasteboard instance which will be used by clipboard_watcher() to detect changes
+        # to the pasteboard (which everyone but Apple calls the clipboard)
+        self.pasteboard = Pasteboard()
+
+        # will hold ConfirmationWindow if needed; if confirmation is enabled, build the window
+        # now while the app is starting so it's ready the first time text is detected
+        self.confirmation_window = (
+            ConfirmationWindow.alloc().init() if self.confirmation.state else None
+        )
+
+        # last detected text is stored
+        self.last_detected_text = None
+
+        # start watching the clipboard; the clipboard is also checked whenever the user switches apps
+        self._clipboard_interval = CLIPBOARD_CHECK_INTERVAL
+        self._clipboard_timer = None
+        self.schedule_clipboard_check()
+        NSWorkspace.sharedWorkspace().notificationCenter().addObserver_selector_name_object_(
+            self,
+            "application_activated:",
+            NSWorkspaceDidActivateApplicationNotification,
+            None,
+        )
+
+        # start the spotlight query
+        self.start_query()
+
+    def log(self, msg: str):
+        """Log a message to unified log."""
+        NSLog(f"{APP_NAME} {__version__} {msg}")
+
+        # if debug set in config, also log to file
+        # file will be created in Application Support folder
+        if self._debug:
+            with self.open(LOG_FILE, "a") as f:
+                f.write(f"{datetime.datetime.now().isoformat()} - {msg}\n")
+
+    @property
+    def debug(self) -> bool:
+        """True if debug logging is enabled in the config"""
+        return self._debug
+
+    def verify_screenshot_access(self):
+        """Verify screenshot access and alert user if needed"""
+        if screenshot_location := get_screenshot_location():
+            if verify_directory_access(screenshot_location):
+                self.log(f"screenshot location access ok: {screenshot_location}")
+            else:
+                self.log(
+                    f"Error: could not access default screenshot location {screenshot_location}"
+                )
+                rumps.alert(
+                    f"Error: {APP_NAME} could not access the default screenshot location {screenshot_location} \n"
+                    f"You may need to enable Full Disk Access for {APP_NAME} in System Settings...>Privacy & Security> Full Disk Access"
+                )
+        else:
+            self.log(f"Error: could not determine default screenshot location")
+            rumps.alert(
+                f"Error: {APP_NAME} could not determine the default screenshot location. "
+            )
+
+    def load_config(self):
+        """Load config from plist file in Application Support folder.
+
+        The usual app convention is to store config in ~/Library/Preferences but
+        rumps.App.open() provides a convenient self.open() method to access the
+        Application Support folder so that's what is used here.
+
+        The config info is saved as a plist file (property list) which is an Apple standard
+        for storing structured data. JSON or another format could be used but I stuck with
+        plist so that the config file could be easily edited manually if needed and that's
+        what is expected by macOS apps.
+        """
+        self.config = {}
+        # contents of the config file as last read or written; save_config() only writes the
+        # file when the config has changed
+        self._config_data = None
+        with contextlib.suppress(FileNotFoundError):
+            with self.open(CONFIG_FILE, "rb") as f:
+                self._config_data = f.read()
+            with contextlib.suppress(Exception):
+                # don't crash if config file is malformed
+                self.config = plistlib.loads(self._config_data)
+        if not self.config:
+            # file didn't exist or was malformed, create a new one
+            # initialize config with default values
+            self.config = {
+                "confidence": CONFIDENCE_DEFAULT,
+                "linebreaks": True,
+                "append": False,
+                "notification": True,
+                "language": self.recognition_language,
+                "always_detect_english": True,
+                "detect_qrcodes": False,
+                "start_on_login": False,
+                "confirmation": False,
+                "detect_clipboard": True,
+            }
+        self.log(f"loaded config: {self.config}")
+
+        # update the menu state to match the loaded config
+        self.append.state = self.config.get("append", False)
+        self.linebreaks.state = self.config.get("linebreaks", True)
+        self.show_notification.state = self.config.get("notification", True)
+        self.set_confidence_state(self.config.get("confidence", CONFIDENCE_DEFAULT))
+        self.recognition_language = self.config.get(
+            "language", self.recognition_language
+        )
+        self.set_language_menu_state(self.recognition_language)
+        self.language_english.state = self.config.get("always_detect_english", True)
+        self.update_active_languages()
+        self.detect_clipboard.state = self.config.get("detect_clipboard", True)
+        self.confirmation.state = self.config.get("confirmation", False)
+        self.qrcodes.state = self.config.get("detect_qrcodes", False)
+        self._debug = self.config.get("debug", False)
+        self.start_on_login.state = self.config.get("start_on_login", False)
+
+        # save config because it may have been updated with default values
+        self.save_config()
+
+    def save_config(self):
+        """Write config to plist file in Application Support folder.
+
+        See docstring on load_config() for additional information.
+        """
+        self.config["linebreaks"] = self.linebreaks.state
+        self.config["append"] = self.append.state
+        self.config["notification"] = self.show_notification.state
+        self.config["confidence"] = self.get_confidence_state()
+        self.config["language"] = self.recognition_language
+        self.config["always_detect_english"] = self.language_english.state
+        self.config["detect_clipboard"] = self.detect_clipboard.state
+        self.config["confirmation"] = self.confirmation.state
+        self.config["detect_qrcodes"] = self.qrcodes.state
+        self.config["debug"] = self._debug
+        self.config["start_on_login"] = self.start_on_login.state
+        data = plistlib.dumps(self.config)
+        if data == self._config_data:
+            return
+        # write atomically so the config file is never left half written
+        config_path = os.path.join(rumps.application_support(self.name), CONFIG_FILE)
+        if not NSData.dataWithBytes_length_(data, len(data)).writeToFile_atomically_(
+            config_path, True
+        ):
+            # leave _config_data unchanged so the next save tries again
+            self.log(f"Error: could not save config to {config_path}")
+            return
+        self._config_data = data
+        self.log(f"saved config: {self.config}")
+
+    def on_language(self, sender):
+        """Change language."""
+        self.recognition_language = sender.title
+        self.set_language_menu_state(sender.title)
+        self.update_active_languages()
+        self.save_config()
+
+    def on_pause(self, sender):
+        """Pause/resume text detection."""
+        if self._paused:
+            self._paused = False
+            self.icon = APP_ICON
+            sender.title = "Pause Text Detection"
+        else:
+            self._paused = True
+            self.icon = APP_ICON_PAUSED
+            sender.title = "Resume text detection"
+
+    def on_toggle(self, sender):
+        """Toggle sender state."""
+        sender.state = not sender.state
+        if sender is self.language_english:
+            self.update_active_languages()
+        self.save_config()
+
+    def on_clear_clipboard(self, sender):
+        """Clear the clipboard"""
+        self.pasteboard.clear()
+
+    def on_confidence(self, sender):
+        """Change confidence threshold."""
+        self.clear_confidence_state()
+        sender.state = True
+        self._confidence_value = CONFIDENCE[self.get_confidence_state()]
+        self.save_config()
+
+    def on_show_last_detection(self, sender):
+        """Show last detected text"""
+        self.confirmation_window = (
+            self.confirmation_window or ConfirmationWindow.alloc().init()
+        )
+        self.confirmation_window.show(self.last_detected_text or "", self)
+
+    def clear_confidence_state(self):
+        """Clear confidence menu state"""
+        self.confidence_low.state = False
+        self.confidence_medium.state = False
+        self.confidence_high.state = False
+
+    def get_confidence_state(self):
+        """Get confidence threshold state."""
+        if self.confidence_low.state:
+            return "LOW"
+        elif self.confidence_medium.state:
+            return "MEDIUM"
+        elif self.confidence_high.state:
+            return "HIGH"
+        else:
+            return CONFIDENCE_DEFAULT
+
+    def set_confidence_state(self, confidence):
+        """Set confidence threshold state."""
+        self.clear_confidence_state()
+        if confidence == "LOW":
+            self.confidence_low.state = True
+        elif confidence == "MEDIUM":
+            self.confidence_medium.state = True
+        elif confidence == "HIGH":
+            self.confidence_high.state = True
+        else:
+            raise ValueError(f"Unknown confidence threshold: {confidence}")
+        self._confidence_value = CONFIDENCE[confidence]
+
+    def set_language_menu_state(self, language):
+        """Set the language menu state"""
+        # only the previously checked item and the new item need to change
+        item = self._language_items.get(language)
+        if item is self._language_item:
+            return
+        if self._language_item:
+            self._language_item.state = False
+        if item:
+            item.state = True
+        self._language_item = item
+
+    def update_active_languages(self):
+        """Update the languages used for text detection to match the language settings"""
+        # if "Always Detect English" checked, add English to list of languages to detect
+        self._active_languages = (
+            (self.recognition_language, LANGUAGE_ENGLISH)
+            if self.language_english.state
+            and self.recognition_language != LANGUAGE_ENGLISH
+            else (self.recognition_language,)
+        )
+
+    def on_start_on_login(self, sender):
+        """Configure app to start on login or toggle this setting."""
+        self.start_on_login.state = not self.start_on_login.state
+        if self.start_on_login.state:
+            app_path = get_app_path()
+            self.log(f"adding app to login items with path {app_path}")
+            if APP_NAME not in list_login_items():
+                add_login_item(APP_NAME, app_path, hidden=False)
+        else:
+            self.log("removing app from login items")
+            if APP_NAME in list_login_items():
+                remove_login_item(APP_NAME)
+        self.save_config()
+
+    def on_about(self, sender):
+        """Display about dialog."""
+        rumps.alert(
+            title=f"About {APP_NAME}",
+            message=f"{APP_NAME} Version {__version__}\n\n"
+            f"{APP_NAME} is a simple utility to recognize text in screenshots.\n\n"
+            f"{APP_NAME} is open source and licensed under the MIT license.\n\n"
+            "Copyright 2022 by Rhet Turnbull\n"
+            "https://github.com/RhetTbull/textinator",
+            ok="OK",
+        )
+
+    def on_quit(self, sender):
+        """Cleanup before quitting."""
+        self.log("quitting")
+        NSNotificationCenter.defaultCenter().removeObserver_(self)
+        NSWorkspace.sharedWorkspace().notificationCenter().removeObserver_(self)
+        if self._clipboard_timer:
+            self._clipboard_timer.invalidate()
+        self.query.stopQuery()
+        self.query.setDelegate_(None)
+        self.query.release()
+        rumps.quit_application()
+
+    def start_query(self):
+        """Start the NSMetdataQuery Spotlight query to monitor for screenshot files."""
+        self.query = NSMetadataQuery.alloc().init()
+
+        # screenshots all have metadata property kMDItemIsScreenCapture set to 1
+        # this can be viewed with the command line tool mdls
+        self.query.setPredicate_(
+            NSPredicate.predicateWithFormat_("kMDItemIsScreenCapture = 1")
+        )
+
+        # configure the query to post notifications, which our query_updated method will handle
+        nf = NSNotificationCenter.defaultCenter()
+        nf.addObserver_selector_name_object_(
+            self,
+            "query_updated:",
+            None,
+            self.query,
+        )
+        self.query.setDelegate_(self)
+        self.query.startQuery()
+
+    def initialize_screenshots(self, notif):
+        """Track all screenshots already seen or that existed on app startup.
+
+        The Spotlight query will return *all* screenshots on the computer so track those results
+        when returned and only process new screenshots.
+        """
+        query = notif.object()
+        with query_updates_disabled(query):
+            self._seen_paths.update(
+                query.resultAtIndex_(i).valueForAttribute_("kMDItemPath")
+                for i in range(query.resultCount())
+            )
+
+    def process_screenshot(self, notif):
+        """Process a new screenshot and detect text (and QR codes if requested)."""
+        query = notif.object()
+        seen_paths = self._seen_paths
+        seen_files = self._seen_files
+        # read the paths then re-enable updates before processing new screenshots
+        # so the query isn't held up while text detection runs
+        with query_updates_disabled(query):
+            paths = [
+                query.resultAtIndex_(i).valueForAttribute_("kMDItemPath")
+                for i in range(query.resultCount())
+            ]
+        for path in paths:
+            if path in seen_paths:
+                # we've already seen this screenshot or screenshot existed at app startup, skip it
+                continue
+
+            # only stat paths not seen before; the same file may be found by another path
+            try:
+                st = os.stat(path)
+            except OSError:
+                # file is gone (or not yet readable); check it again on the next update
+                continue
+            file_key = (st.st_dev, st.st_ino)
+            seen_paths.add(path)
+            if file_key in seen_files:
+                continue
+            seen_files.add(file_key)
+
+            if self._paused:
+                # don't process screenshots if paused but still add to seen list
+                self.log(f"skipping screenshot because app is paused: {path}")
+                continue
+
+            self.log(f"processing new screenshot: {path}")
+
+            screenshot_image = ciimage_from_file(path)
+            if screenshot_image is None:
+                self.log(f"failed to load screenshot image: {path}")
+                # try again on the next update
+                seen_paths.discard(path)
+                seen_files.discard(file_key)
+                continue
+
+            self.process_image(
+                screenshot_image,
+                functools.partial(
+                    self.notify_detected_text, "Processed Screenshot", f"{path}"
+                ),
+            )
+
+    def process_image(
+        self,
+        image: "Quartz.CIImage",
+        completion: t.Optional[t.Callable[[str], None]] = None,
+    ):
+        """Process an image and detect text (and QR codes if requested).
+        Text detection runs on a background thread; when it finishes, the clipboard is updated
+        with the detected text on the main thread.
+
+        Args:
+            image: Quartz.CIImage
+            completion: optional function called on the main thread with the string of detected text
+                (or empty string if no text detected) after the clipboard is updated
+        """
+        # text detection runs on macvision's single background thread so the menu bar stays
+        # responsive; images are processed in the order they arrive so clipboard updates
+        # (which may append to the clipboard) happen in the same order
+        qrcodes = bool(self.qrcodes.state)
+        if qrcodes:
+            future = detect_text_and_qrcodes_in_ciimage_async(
+                image, languages=self._active_languages
+            )
+        else:
+            future = detect_text_in_ciimage_async(
+                image, languages=self._active_languages
+            )
+        # the results are formatted with the settings in effect when the image was submitted
+        format_text = functools.partial(
+            format_detected_text,
+            qrcodes=qrcodes,
+            confidence=self._confidence_value,
+            linebreaks=bool(self.linebreaks.state),
+        )
+        future.add_done_callback(
+            lambda done: AppHelper.callAfter(
+                self.text_detected, done, format_text, completion
+            )
+        )
+
+    def text_detected(
+        self,
+        future: concurrent.futures.Future,
+        format_text: t.Callable[[t.Any], str],
+        completion: t.Optional[t.Callable[[str], None]],
+    ):
+        """Update the clipboard with the text detected by process_image; runs on the main thread."""
+        try:
+            text = format_text(future.result())
+        except Exception as e:
+            self.log(f"Error: text detection failed: {e}")
+            text = ""
+
+        if text:
+            self.last_detected_text = text
+
+            if self.append.state:
+                clipboard_text = (
+                    self.pasteboard.paste() if self.pasteboard.has_text() else ""
+                )
+                clipboard_text = f"{clipboard_text}\n{text}" if clipboard_text else text
+            else:
+                clipboard_text = text
+
+            if self.confirmation.state:
+                # display confirmation dialog
+                verb = "Append" if self.append.state else "Copy"
+                self.confirmation_window = (
+                    self.confirmation_window or ConfirmationWindow.alloc().init()
+                )
+                self.confirmation_window.show(text, self)
+            else:
+                self.pasteboard.copy(clipboard_text)
+
+        if completion:
+            completion(text)
+
+    def query_updated_(self, notif):
+        """Receives and processes notifications from the Spotlight query.
+        The trailing _ in the name is required by PyObjC to conform to Objective-C calling conventions.
+        Reference: https://pyobjc.readthedocs.io/en/latest/core/intro.html#underscores-and-lots-of-them
+        """
+        if notif.name() == NSMetadataQueryDidStartGatheringNotification:
+            # The query has just started
+            self.log("search: query started")
+        elif notif.name() == NSMetadataQueryDidFinishGatheringNotification:
+            # The query has just finished
+            # log all results so we don't try to do text detection on previous screenshots
+            self.log("search: finished gathering")
+            self.initialize_screenshots(notif)
+        elif notif.name() == NSMetadataQueryGatheringProgressNotification:
+            # The query is still gathering results...
+            self.log("search: gathering progress")
+        elif notif.name() == NSMetadataQueryDidUpdateNotification:
+            # There's a new result available
+            self.log("search: an update happened.")
+            self.process_screenshot(notif)
+
+    def schedule_clipboard_check(self):
+        """Schedule clipboard_watcher() to run in self._clipboard_interval seconds."""
+        if self._clipboard_timer:
+            self._clipboard_timer.invalidate()
+        self._clipboard_timer = (
+            NSTimer.timerWithTimeInterval_target_selector_userInfo_repeats_(
+                self._clipboard_interval, self, "clipboard_timer_fired:", None, False
+            )
+        )
+        # common modes so the timer also fires while a menu is open
+        NSRunLoop.currentRunLoop().addTimer_forMode_(
+            self._clipboard_timer, NSRunLoopCommonModes
+        )
+
+    def clipboard_timer_fired_(self, timer):
+        """Check the clipboard then schedule the next check.
+        The interval backs off while the clipboard is unchanged and resets when it changes.
+        """
+        self._clipboard_timer = None
+        changed = True
+        try:
+            changed = self.clipboard_watcher()
+        finally:
+            # always schedule the next check so an error doesn't stop clipboard detection
+            if changed:
+                self._clipboard_interval = CLIPBOARD_CHECK_INTERVAL
+            else:
+                self._clipboard_interval = min(
+                    self._clipboard_interval * CLIPBOARD_CHECK_BACKOFF,
+                    CLIPBOARD_CHECK_INTERVAL_MAX,
+                )
+            self.schedule_clipboard_check()
+
+    def application_activated_(self, notif):
+        """Check the clipboard right away when the user switches apps."""
+        try:
+            self.clipboard_watcher()
+        finally:
+            self._clipboard_interval = CLIPBOARD_CHECK_INTERVAL
+            self.schedule_clipboard_check()
+
+    def clipboard_watcher(self) -> bool:
+        """Watch the clipboard (pasteboard) for changes.
+        Called by a timer every CLIPBOARD_CHECK_INTERVAL to CLIPBOARD_CHECK_INTERVAL_MAX seconds
+        and when the user switches apps.
+        The timer runs even if detect_clipboard is not checked or app is paused
+        but won't process images in those cases.
+
+        Returns:
+            True if the clipboard changed since the last check, otherwise False
+        """
+        if not self.detect_clipboard.state:
+            return False
+
+        if not self.pasteboard.has_changed():
+            return False
+
+        has_text, has_png, has_tiff = self.pasteboard.peek()
+        if has_png or has_tiff:
+            # image is on the pasteboard, process it
+            self.log("new image on clipboard")
+            if has_text:
+                # some apps like Excel copy an image representation of the text to the clipboard
+                # in addition to the text, in this case do not do text detection, see #16
+                self.log("clipboard has text, skipping")
+                return True
+            if self._paused:
+                self.log("skipping clipboard image because app is paused")
+                return True
+            self.process_clipboard_image()
+        return True
+
+    def process_clipboard_image(self):
+        """Process the image on the clipboard."""
+        if image_data := self.pasteboard.get_image_data(TIFF):
+            image = ciimage_from_data(image_data)
+            self.process_image(image, self.clipboard_image_processed)
+        else:
+            self.log("failed to get image data from pasteboard")
+
+    def clipboard_image_processed(self, detected_text: str):
+        """Called after text detection on the clipboard image finishes."""
+        self.log("processed clipboard image")
+        self.notify_detected_text("Processed Clipboard Image", "", detected_text)
+
+    def notify_detected_text(self, title: str, subtitle: str, detected_text: str):
+        """Display a notification with the detected text if notifications are enabled."""
+        if self.show_notification.state:
+            self.notification(
+                title=title,
+                subtitle=subtitle,
+                message=(
+                    f"Detected text: {detected_text}"
+                    if detected_text
+                    else "No text detected"
+                ),
+            )
+
+    def notification(self, title, subtitle, message):
+        """Display a notification."""
+        self.log(f"notification: {title} - {subtitle} - {message}")
+        rumps.notification(title, subtitle, message)
+
+
+def format_detected_text(
+    results: t.Any,
+    qrcodes: bool,
+    confidence: float,
+    linebreaks: bool,
+) -> str:
+    """Return the text detected by macvision as a single string.
+
+    Args:
+        results: result of detect_text_in_ciimage or, if qrcodes is True,
+            detect_text_and_qrcodes_in_ciimage
+        qrcodes: True if results include QR codes
+        confidence: minimum confidence for detected text to be included
+        linebreaks: if False, line breaks in the detected text are replaced with spaces
+
+    Returns:
+        String of detected text or empty string if no text detected.
+    """
+    if qrcodes:
+        detected_text, detected_qrcodes = results
+    else:
+        detected_text, detected_qrcodes = results, []
+    # join with spaces instead of line breaks if line breaks aren't kept;
+    # each detected text result is a single line
+    joiner = "\n" if linebreaks else " "
+    text = joiner.join(result[0] for result in detected_text if result[1] >= confidence)
+
+    if detected_qrcodes:
+        if not linebreaks:
+            # QR code payloads may contain line breaks
+            detected_qrcodes = [
+                qrcode.replace("\n", " ") for qrcode in detected_qrcodes
+            ]
+        text = joiner.join([text, *detected_qrcodes] if text else detected_qrcodes)
+
+    return text
+
+
+@contextlib.contextmanager
+def query_updates_disabled(query: NSMetadataQuery):
+    """Context manager to stop query's results from changing while they're read"""
+    query.disableUpdates()
+    try:
+        yield query
+    finally:
+        query.enableUpdates()
+
+
+def serviceSelector(fn):
+    """Decorator to convert a method to a selector to handle an NSServices message."""
+    return objc.selector(fn, signature=b"v@:@@o^@")
+
+
+def ErrorValue(e):
+    """Handler for errors returned by the service."""
+    NSLog(f"{APP_NAME} {__version__} error: {e}")
+    return e
+
+
+class ServiceProvider(NSObject):
+    """Service provider class to handle messages from the Services menu
+
+    Initialize with ServiceProvider.alloc().initWithApp_(app)
+
+    Note: image files are passed to the app via the Services menu (detectTextInImage), not as
+    command line arguments or open document events, so the app is built without py2app's argv_emulation.
+    """
+
+    app: t.Optional[Textinator] = None
+
+    def initWithApp_(self, app: Textinator):
+        self = objc.super(ServiceProvider, self).init()
+        self.app = app
+        return self
+
+    @serviceSelector
+    def detectTextInImage_userData_error_(
+        self, pasteboard, userdata, error
+    ) -> t.Optional[str]:
+        """Detect text in an image on the clipboard.
+
+        This method will be called by the Services menu when the user selects "Detect Text With Textinator".
+        It is specified in the setup.py NSMessage attribute. The method name in NSMessage is `detectTextInImage`
+        but the actual Objective-C signature is `detectTextInImage:userData:error:` hence the matching underscores
+        in the python method name.
+
+        Args:
+            pasteboard: NSPasteboard object containing the URLs of the image files to process
+            userdata: Unused, passed by the Services menu as value of NSUserData attribute in setup.py;
+                can be used to pass additional data to the service if needed
+            error: Unused; in Objective-C, error is a pointer to an NSError object that will be set if an error occurs;
+                when using pyobjc, errors are returned as str values and the actual error argument is ignored.
+
+        Returns:
+            error: str value containing the error message if an error occurs, otherwise None
+
+        Note: because this method is explicitly invoked by the user via the Services menu, it will
+        be called and files processed even if the app is paused.
+
+        """
+        self.app.log("detectTextInImage_userData_error_ called via Services menu")
+
+        try:
+            for item in pasteboard.pasteboardItems():
+                # pasteboard will contain one or more URLs to image files passed by the Services menu
+                pb_url_data = item.dataForType_(NSPasteboardTypeFileURL)
+                pb_url = NSURL.URLWithDataRepresentation_relativeToURL_(
+                    pb_url_data, None
+                )
+                path = pb_url.path()
+                self.app.log(f"processing file from Services menu: {path}")
+                image = ciimage_from_url(pb_url)
+                self.app.process_image(
+                    image,
+                    functools.partial(
+                        self.app.notify_detected_text, "Processed Image", f"{path}"
+                    ),
+                )
+        except Exception as e:
+            return ErrorValue(e)
+
+        return None
@@ -6,6 +6,8 @@ Copyright (c) 2023, Rhet Turnbull; licensed under MIT License.
 from __future__ import annotations
 
 import datetime
+import functools
+import operator
 import os
 import zoneinfo
 from collections.abc import Iterable
@@ -15,20 +17,57 @@ from typing import Any, Callable
 import AppKit
 from AppKit import (
     NSApp,
+    NSBackingStoreBuffered,
+    NSBezelBorder,
     NSBox,
+    NSBoxSeparator,
     NSButton,
+    NSButtonTypeSwitch,
     NSComboBox,
     NSDatePicker,
+    NSDatePickerElementFlagHourMinute,
+    NSDatePickerElementFlagYearMonthDay,
+    NSDatePickerModeSingle,
+    NSDatePickerStyleClockAndCalendar,
+    NSDatePickerStyleTextFieldAndStepper,
+    NSForegroundColorAttributeName,
+    NSImageAlignCenter,
+    NSImageScaleNone,
+    NSImageScaleProportionallyUpOrDown,
     NSImageView,
+    NSLayoutAttributeHeight,
+    NSLayoutAttributeLeft,
+    NSLayoutAttributeTop,
+    NSLayoutAttributeWidth,
+    NSLayoutConstraint,
+    NSLayoutConstraintOrientationHorizontal,
+    NSLayoutConstraintOrientationVertical,
+    NSLayoutPriorityDefaultHigh,
+    NSLayoutPriorityFittingSizeCompression,
+    NSLayoutRelationEqual,
+    NSLinkAttributeName,
+    NSNoBorder,
+    NSRadioButton,
     NSScrollView,
     NSStackView,
+    NSStackViewDistributionFill,
     NSTextField,
+    NSTextFieldSquareBezel,
     NSTextView,
     NSTimeZone,
+    NSUnderlineStyleAttributeName,
+    NSUnderlineStyleSingle,
+    NSUserInterfaceLayoutOrientationHorizontal,
+    NSUserInterfaceLayoutOrientationVertical,
     NSView,
+    NSViewHeightSizable,
+    NSViewWidthSizable,
+    NSWindowStyleMaskClosable,
+    NSWindowStyleMaskResizable,
+    NSWindowStyleMaskTitled,
 )
-from Foundation import NSURL, NSDate, NSLog, NSMakeRect, NSMakeSize, NSObject
-from objc import objc_method, python_method, super
+from Foundation import NSURL, NSArray, NSDate, NSLog, NSMakeRect, NSMakeSize, NSObject
+from objc import autorelease_pool, objc_method, python_method, super
 
 ################################################################################
 # Constants
@@ -40,6 +79,14 @@ EDGE_INSET = 20
 # padding between elements
 PADDING = 8
 
+# text attributes for LinkLabel; linkColor is a dynamic system color so it
+# still follows the light/dark appearance
+LINK_COLOR = AppKit.NSColor.linkColor()
+LINK_UNDERLINE_STYLE = NSUnderlineStyleSingle
+
+# NSDate's reference date is 2001-01-01 00:00:00 +0000
+NSDATE_REFERENCE_DATE = datetime.datetime(2001, 1, 1, tzinfo=datetime.timezone.utc)
+
 
 ################################################################################
 # Window and Application
@@ -49,15 +96,15 @@ PADDING = 8
 def window(
     title: str | None = None,
     size: tuple[int, int] = (600, 600),
-    mask: int = AppKit.NSWindowStyleMaskTitled
-    | AppKit.NSWindowStyleMaskClosable
-    | AppKit.NSWindowStyleMaskResizable,
+    mask: int = NSWindowStyleMaskTitled
+    | NSWindowStyleMaskClosable
+    | NSWindowStyleMaskResizable,
 ) -> AppKit.NSWindow:
     """Create a window with a title and size"""
     new_window = AppKit.NSWindow.alloc().initWithContentRect_styleMask_backing_defer_(
         NSMakeRect(0, 0, *size),
         mask,
-        AppKit.NSBackingStoreBuffered,
+        NSBackingStoreBuffered,
         False,
     )
     new_window.center()
@@ -68,7 +115,7 @@ def window(
 
 def main_view(
     window: AppKit.NSWindow,
-    align: int = AppKit.NSLayoutAttributeLeft,
+    align: int = NSLayoutAttributeLeft,
     padding: int = PADDING,
     edge_inset: tuple[float, float, float, float] | float = EDGE_INSET,
 ) -> AppKit.NSView:
@@ -80,40 +127,44 @@ def main_view(
         padding: padding between elements
         edge_inset: The geometric padding, in points, inside the stack view, surrounding its views (NSEdgeInsets)
     """
+    with autorelease_pool():
+        # This uses appkitgui.StackView which is a subclass of NSStackView
+        # that supports some list methods such as append, extend, remove, ...
+        main_view = StackView.stackViewWithViews_(None)
+        configure_stack(
+            main_view,
+            NSUserInterfaceLayoutOrientationVertical,
+            padding,
+            align,
+            NSStackViewDistributionFill,
+        )
+        edge_insets = (
+            even_edge_insets(edge_inset)
+            if isinstance(edge_inset, (int, float))
+            else edge_inset
+        )
+        main_view.setEdgeInsets_(edge_insets)
 
-    # This uses appkitgui.StackView which is a subclass of NSStackView
-    # that supports some list methods such as append, extend, remove, ...
-    main_view = StackView.stackViewWithViews_(None)
-    main_view.setOrientation_(AppKit.NSUserInterfaceLayoutOrientationVertical)
-    main_view.setSpacing_(padding)
-    if isinstance(edge_inset, (int, float)):
-        # use even insets
-        edge_insets = (edge_inset, edge_inset, edge_inset, edge_inset)
-    else:
-        edge_insets = edge_inset
-    main_view.setEdgeInsets_(edge_insets)
-    main_view.setDistribution_(AppKit.NSStackViewDistributionFill)
-    main_view.setAlignment_(align)
-
-    window.contentView().addSubview_(main_view)
-    top_constraint = main_view.topAnchor().constraintEqualToAnchor_(
-        main_view.superview().topAnchor()
-    )
-    top_constraint.setActive_(True)
-    bottom_constraint = main_view.bottomAnchor().constraintEqualToAnchor_(
-        main_view.superview().bottomAnchor()
-    )
-    bottom_constraint.setActive_(True)
-    left_constraint = main_view.leftAnchor().constraintEqualToAnchor_(
-        main_view.superview().leftAnchor()
-    )
-    left_constraint.setActive_(True)
-    right_constraint = main_view.rightAnchor().constraintEqualToAnchor_(
-        main_view.superview().rightAnchor()
-    )
-    right_constraint.setActive_(True)
+        main_view.setTranslatesAutoresizingMaskIntoConstraints_(False)
+        window.contentView().addSubview_(main_view)
+        top_constraint = main_view.topAnchor().constraintEqualToAnchor_(
+            main_view.superview().topAnchor()
+        )
+        bottom_constraint = main_view.bottomAnchor().constraintEqualToAnchor_(
+            main_view.superview().bottomAnchor()
+        )
+        left_constraint = main_view.leftAnchor().constraintEqualToAnchor_(
+            main_view.superview().leftAnchor()
+        )
+        right_constraint = main_view.rightAnchor().constraintEqualToAnchor_(
+            main_view.superview().rightAnchor()
+        )
+        # activate all constraints at once so the layout engine is only updated once
+        NSLayoutConstraint.activateConstraints_(
+            [top_constraint, bottom_constraint, left_constraint, right_constraint]
+        )
 
-    return main_view
+        return main_view
 
 
 ################################################################################
@@ -132,8 +183,10 @@ class StackView(NSStackView):
     @python_method
     def extend(self, views: Iterable[NSView]):
         """Extend stack with the contents of views"""
+        # look up the bound method once instead of once per view
+        add_view = self.addArrangedSubview_
         for view in views:
-            self.append(view)
+            add_view(view)
 
     @python_method
     def insert(self, i: int, view: NSView):
@@ -147,7 +200,11 @@ class StackView(NSStackView):
 
 
 class ScrolledStackView(NSScrollView):
-    """A scrollable stack view; use self.documentView() or self.stack to access the stack view"""
+    """A scrollable stack view; use self.documentView() or self.stack to access the stack view
+
+    The list methods use self.stack rather than self.documentView() to avoid an extra
+    Objective-C message on every call.
+    """
 
     def initWithStack_(
         self,
@@ -162,7 +219,7 @@ class ScrolledStackView(NSScrollView):
         self.stack: NSStackView | StackView = stack
         self.setHasVerticalScroller_(vscroll)
         self.setHasHorizontalScroller_(hscroll)
-        self.setBorderType_(AppKit.NSNoBorder)
+        self.setBorderType_(NSNoBorder)
         self.setTranslatesAutoresizingMaskIntoConstraints_(False)
         self.setDrawsBackground_(False)
         self.setAutohidesScrollers_(True)
@@ -174,23 +231,24 @@ class ScrolledStackView(NSScrollView):
     @python_method
     def append(self, view: NSView):
         """Add view to stack"""
-        self.documentView().addArrangedSubview_(view)
+        self.stack.addArrangedSubview_(view)
 
     @python_method
     def extend(self, views: Iterable[NSView]):
         """Extend stack with the contents of views"""
+        add_view = self.stack.addArrangedSubview_
         for view in views:
-            self.documentView().append(view)
+            add_view(view)
 
     @python_method
     def insert(self, i: int, view: NSView):
         """Insert view at index i"""
-        self.documentView().insertArrangedSubview_atIndex_(view, i)
+        self.stack.insertArrangedSubview_atIndex_(view, i)
 
     @python_method
     def remove(self, view: NSView):
         """Remove view from the stack"""
-        self.documentView().removeArrangedSubview_(view)
+        self.stack.removeArrangedSubview_(view)
 
     def setSpacing_(self, spacing):
         self.stack.setSpacing_(spacing)
@@ -217,9 +275,9 @@ class LinkLabel(NSTextField):
         if not self:
             return
 
-        attr_str = self.attributedStringWithLinkToURL_text_(url, text)
-        self.setAttributedStringValue_(attr_str)
         self.url = NSURL.URLWithString_(url)
+        attr_str = self.attributedStringWithLinkToURL_text_(self.url, text)
+        self.setAttributedStringValue_(attr_str)
         self.setBordered_(False)
         self.setSelectable_(False)
         self.setEditable_(False)
@@ -240,11 +298,11 @@ class LinkLabel(NSTextField):
     def mouseExited_(self, event):
         AppKit.NSCursor.pop()
 
-    def attributedStringWithLinkToURL_text_(self, url: str, text: str):
+    def attributedStringWithLinkToURL_text_(self, url: NSURL, text: str):
         linkAttributes = {
-            AppKit.NSLinkAttributeName: NSURL.URLWithString_(url),
-            AppKit.NSUnderlineStyleAttributeName: AppKit.NSUnderlineStyleSingle,
-            AppKit.NSForegroundColorAttributeName: AppKit.NSColor.linkColor(),
+            NSLinkAttributeName: url,
+            NSUnderlineStyleAttributeName: LINK_UNDERLINE_STYLE,
+            NSForegroundColorAttributeName: LINK_COLOR,
             # AppKit.NSCursorAttributeName: AppKit.NSCursor.pointingHandCursor(),
         }
         return AppKit.NSAttributedString.alloc().initWithString_attributes_(
@@ -262,12 +320,14 @@ class ComboBoxDelegate(NSObject):
 
         self.target = target
         self.action_change = action
+        # a str action is a selector to send to target, otherwise it's a callable
+        self.action_is_selector = isinstance(action, str)
         return self
 
     @objc_method
     def comboBoxSelectionDidChange_(self, notification):
         if self.action_change:
-            if type(self.action_change) == str:
+            if self.action_is_selector:
                 self.target.performSelector_withObject_(
                     self.action_change, notification.object()
                 )
@@ -294,19 +354,16 @@ class ScrollViewWithTextView(NSScrollView):
         self = super().initWithFrame_(NSMakeRect(0, 0, *size))
         if not self:
             return
-        self.setBorderType_(AppKit.NSBezelBorder)
+        self.setBorderType_(NSBezelBorder)
         self.setHasVerticalScroller_(vscroll)
         self.setDrawsBackground_(True)
         self.setAutohidesScrollers_(True)
-        self.setAutoresizingMask_(
-            AppKit.NSViewWidthSizable | AppKit.NSViewHeightSizable
-        )
+        self.setAutoresizingMask_(NSViewWidthSizable | NSViewHeightSizable)
         self.setTranslatesAutoresizingMaskIntoConstraints_(False)
 
         width_constraint = self.widthAnchor().constraintEqualToConstant_(size[0])
-        width_constraint.setActive_(True)
         height_constraint = self.heightAnchor().constraintEqualToConstant_(size[1])
-        height_constraint.setActive_(True)
+        NSLayoutConstraint.activateConstraints_([width_constraint, height_constraint])
 
         contentSize = self.contentSize()
         self.textView = NSTextView.alloc().initWithFrame_(self.contentView().frame())
@@ -346,9 +403,47 @@ class ScrollViewWithTextView(NSScrollView):
 ################################################################################
 
 
+def stack_views(
+    views: Iterable[NSView] | NSArray | None,
+) -> list[NSView] | tuple[NSView, ...] | NSArray | None:
+    """Return views in a form that can be passed to stackViewWithViews_
+
+    Lists, tuples and NSArrays are passed to Objective-C as is (PyObjC wraps lists and tuples
+    without copying them); any other iterable, such as a generator, is read into a list once.
+    """
+    if views is None or isinstance(views, (list, tuple, NSArray)):
+        return views
+    return list(views)
+
+
+def configure_stack(
+    stack: NSStackView,
+    orientation: int,
+    spacing: float,
+    align: int,
+    distribute: int | None = None,
+):
+    """Set the layout properties of a stack view
+
+    Args:
+        stack: the NSStackView to configure
+        orientation: NSUserInterfaceLayoutOrientation constant
+        spacing: spacing between views
+        align: NSLayoutAttribute alignment constant
+        distribute: NSStackViewDistribution distribution constant; if None, the distribution is not changed
+
+    Note: orientation is set first because the valid alignments depend on it
+    """
+    stack.setOrientation_(orientation)
+    stack.setSpacing_(spacing)
+    stack.setAlignment_(align)
+    if distribute is not None:
+        stack.setDistribution_(distribute)
+
+
 def hstack(
-    align: int = AppKit.NSLayoutAttributeTop,
-    distribute: int | None = AppKit.NSStackViewDistributionFill,
+    align: int = NSLayoutAttributeTop,
+    distribute: int | None = NSStackViewDistributionFill,
     vscroll: bool = False,
     hscroll: bool = False,
     views: (
@@ -368,32 +463,37 @@ def hstack(
 
     Returns: StackView
     """
-    hstack = StackView.stackViewWithViews_(views)
-    hstack.setSpacing_(PADDING)
-    hstack.setOrientation_(AppKit.NSUserInterfaceLayoutOrientationHorizontal)
-    if distribute is not None:
-        hstack.setDistribution_(distribute)
-    hstack.setAlignment_(align)
-    hstack.setTranslatesAutoresizingMaskIntoConstraints_(False)
-    hstack.setHuggingPriority_forOrientation_(
-        AppKit.NSLayoutPriorityDefaultHigh,
-        AppKit.NSLayoutConstraintOrientationHorizontal,
-    )
-    if edge_inset:
-        if isinstance(edge_inset, (int, float)):
-            # use even insets
-            edge_insets = (edge_inset, edge_inset, edge_inset, edge_inset)
-        else:
-            edge_insets = edge_inset
-        hstack.setEdgeInsets_(edge_insets)
-    if vscroll or hscroll:
-        scroll_view = ScrolledStackView.alloc().initWithStack_(hstack, vscroll, hscroll)
-        return scroll_view
-    return hstack
+    with autorelease_pool():
+        hstack = StackView.stackViewWithViews_(stack_views(views))
+        configure_stack(
+            hstack,
+            NSUserInterfaceLayoutOrientationHorizontal,
+            PADDING,
+            align,
+            distribute,
+        )
+        hstack.setTranslatesAutoresizingMaskIntoConstraints_(False)
+        hstack.setHuggingPriority_forOrientation_(
+            NSLayoutPriorityDefaultHigh,
+            NSLayoutConstraintOrientationHorizontal,
+        )
+        if edge_inset:
+            edge_insets = (
+                even_edge_insets(edge_inset)
+                if isinstance(edge_inset, (int, float))
+                else edge_inset
+            )
+            hstack.setEdgeInsets_(edge_insets)
+        if vscroll or hscroll:
+            scroll_view = ScrolledStackView.alloc().initWithStack_(
+                hstack, vscroll, hscroll
+            )
+            return scroll_view
+        return hstack
 
 
 def vstack(
-    align: int = AppKit.NSLayoutAttributeLeft,
+    align: int = NSLayoutAttributeLeft,
     distribute: int | None = None,
     vscroll: bool = False,
     hscroll: bool = False,
@@ -412,35 +512,43 @@ def vstack(
 
     Returns: StackView
     """
-    vstack = StackView.stackViewWithViews_(views)
-    vstack.setSpacing_(PADDING)
-    vstack.setOrientation_(AppKit.NSUserInterfaceLayoutOrientationVertical)
-    if distribute is not None:
-        vstack.setDistribution_(distribute)
-    vstack.setAlignment_(align)
-    vstack.setTranslatesAutoresizingMaskIntoConstraints_(False)
-    # TODO: set priority as arg? or let user set it later?
-    vstack.setHuggingPriority_forOrientation_(
-        AppKit.NSLayoutPriorityDefaultHigh,
-        AppKit.NSLayoutConstraintOrientationVertical,
-    )
-    if edge_inset:
-        if isinstance(edge_inset, (int, float)):
-            # use even insets
-            edge_insets = (edge_inset, edge_inset, edge_inset, edge_inset)
-        else:
-            edge_insets = edge_inset
-        vstack.setEdgeInsets_(edge_insets)
-
-    if vscroll or hscroll:
-        scroll_view = ScrolledStackView.alloc().initWithStack_(vstack, vscroll, hscroll)
-        return scroll_view
-    return vstack
-
-
-def hspacer() -> NSStackView:
+    with autorelease_pool():
+        vstack = StackView.stackViewWithViews_(stack_views(views))
+        configure_stack(
+            vstack, NSUserInterfaceLayoutOrientationVertical, PADDING, align, distribute
+        )
+        vstack.setTranslatesAutoresizingMaskIntoConstraints_(False)
+        # TODO: set priority as arg? or let user set it later?
+        vstack.setHuggingPriority_forOrientation_(
+            NSLayoutPriorityDefaultHigh,
+            NSLayoutConstraintOrientationVertical,
+        )
+        if edge_inset:
+            edge_insets = (
+                even_edge_insets(edge_inset)
+                if isinstance(edge_inset, (int, float))
+                else edge_inset
+            )
+            vstack.setEdgeInsets_(edge_insets)
+
+        if vscroll or hscroll:
+            scroll_view = ScrolledStackView.alloc().initWithStack_(
+                vstack, vscroll, hscroll
+            )
+            return scroll_view
+        return vstack
+
+
+def hspacer() -> NSView:
     """Create a horizontal spacer"""
-    return vstack()
+    # a plain view has no intrinsic size so it stretches to fill the available space
+    spacer = NSView.alloc().init()
+    spacer.setTranslatesAutoresizingMaskIntoConstraints_(False)
+    spacer.setContentHuggingPriority_forOrientation_(
+        NSLayoutPriorityFittingSizeCompression,
+        NSLayoutConstraintOrientationHorizontal,
+    )
+    return spacer
 
 
 def label(value: str) -> NSTextField:
@@ -472,7 +580,7 @@ def button(title: str, target: NSObject, action: Callable | str | None) -> NSBut
 def checkbox(title: str, target: NSObject, action: Callable | str | None) -> NSButton:
     """Create a checkbox button"""
     checkbox = NSButton.buttonWithTitle_target_action_(title, target, action)
-    checkbox.setButtonType_(AppKit.NSButtonTypeSwitch)  # Switch button type
+    checkbox.setButtonType_(NSButtonTypeSwitch)  # Switch button type
     return checkbox
 
 
@@ -481,7 +589,7 @@ def radio_button(
 ) -> NSButton:
     """Create a radio button"""
     radio_button = NSButton.buttonWithTitle_target_action_(title, target, action)
-    radio_button.setButtonType_(AppKit.NSRadioButton)
+    radio_button.setButtonType_(NSRadioButton)
     return radio_button
 
 
@@ -502,14 +610,15 @@ def combo_box(
         editable: whether the combo box is editable
         action_return: action to send when return is pressed (only called if editable is True)
         action_change: action to send when the selection is changed
-        delegate: delegate to handle events; if not provided a default delegate is automatically created
+        delegate: delegate to handle events; if not provided and action_change is set, a default delegate is automatically created
         width: width of the combo box; if None, the combo box will resize to the contents
 
 
     Note:
         In order to handle certain events such as return being pressed, a delegate is
         required. If a delegate is not provided, a default delegate is automatically
-        created which will call the action_return callback when return is pressed.
+        created which will call the action_change callback when the selection changes;
+        no delegate is created if action_change is None.
         If a delegate is provided, it may implement the following methods:
 
                 - comboBoxSelectionDidChange
@@ -518,9 +627,10 @@ def combo_box(
 
     combo_box = ComboBox.alloc().initWithFrame_(NSMakeRect(0, 0, 100, 25))
     combo_box.setTarget_(target)
-    delegate = delegate or ComboBoxDelegate.alloc().initWithTarget_Action_(
-        target, action_change
-    )
+    if delegate is None and action_change:
+        delegate = ComboBoxDelegate.alloc().initWithTarget_Action_(
+            target, action_change
+        )
     combo_box.setDelegate_(delegate)
     if values:
         combo_box.addItemsWithObjectValues_(values)
@@ -538,7 +648,7 @@ def combo_box(
 def hseparator() -> NSBox:
     """Create a horizontal separator"""
     separator = NSBox.alloc().init()
-    separator.setBoxType_(AppKit.NSBoxSeparator)
+    separator.setBoxType_(NSBoxSeparator)
     separator.setTranslatesAutoresizingMaskIntoConstraints_(False)
     return separator
 
@@ -547,8 +657,8 @@ def image_view(
     path: str | os.PathLike,
     width: int | None = None,
     height: int | None = None,
-    scale: int = AppKit.NSImageScaleProportionallyUpOrDown,
-    align: int = AppKit.NSImageAlignCenter,
+    scale: int = NSImageScaleProportionallyUpOrDown,
+    align: int = NSImageAlignCenter,
 ) -> NSImageView:
     """Create an image view from a an image file.
 
@@ -562,43 +672,55 @@ def image_view(
     Returns: NSImageView
 
     Note: if only one of width or height set, the other will be scaled to maintain aspect ratio.
-    If image is smaller than the specified width or height and scale is set to AppKit.NSImageScaleNone,
+    If image is smaller than the specified width or height and scale is set to NSImageScaleNone,
     the image frame will be larger than the image and the image will be aligned according to align.
     """
-    image = AppKit.NSImage.alloc().initByReferencingFile_(str(path))
-    image_view = NSImageView.imageViewWithImage_(image)
-    image_view.setImageScaling_(scale)
-    image_view.setImageAlignment_(align)
-    image_view.setTranslatesAutoresizingMaskIntoConstraints_(False)
-
-    # if width or height set, constrain to that size
-    # if only one of width or height is set, constrain to that size and scale the other to maintain aspect ratio
-    # if this is not done, the NSImageView intrinsic size may be larger than the window and thus disrupt the layout
-
-    if width:
-        image_view.widthAnchor().constraintEqualToConstant_(width).setActive_(True)
-        if not height:
-            aspect_ratio = image.size().width / image.size().height
-            scaled_height = width / aspect_ratio
-            image_view.heightAnchor().constraintEqualToConstant_(
-                scaled_height
-            ).setActive_(True)
-    if height:
-        image_view.heightAnchor().constraintEqualToConstant_(height).setActive_(True)
-        if not width:
-            aspect_ratio = image.size().width / image.size().height
-            scaled_width = height * aspect_ratio
-            image_view.widthAnchor().constraintEqualToConstant_(
-                scaled_width
-            ).setActive_(True)
-
-    return image_view
+    with autorelease_pool():
+        image = AppKit.NSImage.alloc().initByReferencingFile_(str(path))
+        image_view = NSImageView.imageViewWithImage_(image)
+        image_view.setImageScaling_(scale)
+        image_view.setImageAlignment_(align)
+        image_view.setTranslatesAutoresizingMaskIntoConstraints_(False)
+
+        # if width or height set, constrain to that size
+        # if only one of width or height is set, constrain to that size and scale the other to maintain aspect ratio
+        # if this is not done, the NSImageView intrinsic size may be larger than the window and thus disrupt the layout
+
+        constraints = []
+        if bool(width) != bool(height):
+            # read the image size once; it's only needed to scale the unset dimension
+            image_size = image.size()
+            aspect_ratio = (
+                image_size.width / image_size.height if image_size.height else 1.0
+            )
+        if width:
+            constraints.append(
+                image_view.widthAnchor().constraintEqualToConstant_(width)
+            )
+            if not height:
+                scaled_height = width / aspect_ratio
+                constraints.append(
+                    image_view.heightAnchor().constraintEqualToConstant_(scaled_height)
+                )
+        if height:
+            constraints.append(
+                image_view.heightAnchor().constraintEqualToConstant_(height)
+            )
+            if not width:
+                scaled_width = height * aspect_ratio
+                constraints.append(
+                    image_view.widthAnchor().constraintEqualToConstant_(scaled_width)
+                )
+        if constraints:
+            NSLayoutConstraint.activateConstraints_(constraints)
+
+        return image_view
 
 
 def date_picker(
-    style: int = AppKit.NSDatePickerStyleClockAndCalendar,
-    elements: int = AppKit.NSDatePickerElementFlagYearMonthDay,
-    mode: int = AppKit.NSDatePickerModeSingle,
+    style: int = NSDatePickerStyleClockAndCalendar,
+    elements: int = NSDatePickerElementFlagYearMonthDay,
+    mode: int = NSDatePickerModeSingle,
     date: datetime.date | datetime.datetime | None = None,
     target: NSObject | None = None,
     action: Callable | str | None = None,
@@ -623,7 +745,7 @@ def date_picker(
     date_picker.setDatePickerElements_(elements)
     date_picker.setDatePickerMode_(mode)
     date_picker.setDateValue_(date)
-    date_picker.setTimeZone_(NSTimeZone.localTimeZone())
+    date_picker.setTimeZone_(local_time_zone())
     date_picker.setTranslatesAutoresizingMaskIntoConstraints_(False)
 
     if target:
@@ -634,9 +756,9 @@ def date_picker(
 
 
 def time_picker(
-    style: int = AppKit.NSDatePickerStyleTextFieldAndStepper,
-    elements: int = AppKit.NSDatePickerElementFlagHourMinute,
-    mode: int = AppKit.NSDatePickerModeSingle,
+    style: int = NSDatePickerStyleTextFieldAndStepper,
+    elements: int = NSDatePickerElementFlagHourMinute,
+    mode: int = NSDatePickerModeSingle,
     time: datetime.datetime | datetime.time | None = None,
     target: NSObject | None = None,
     action: Callable | str | None = None,
@@ -688,12 +810,12 @@ def text_field(
     """Create a text field"""
     text_field = NSTextField.alloc().initWithFrame_(NSMakeRect(0, 0, *size))
     text_field.setBezeled_(True)
-    text_field.setBezelStyle_(AppKit.NSTextFieldSquareBezel)
+    text_field.setBezelStyle_(NSTextFieldSquareBezel)
     text_field.setTranslatesAutoresizingMaskIntoConstraints_(False)
+    # an editable text field has no intrinsic width so the size is always constrained
     width_constraint = text_field.widthAnchor().constraintEqualToConstant_(size[0])
-    width_constraint.setActive_(True)
     height_constraint = text_field.heightAnchor().constraintEqualToConstant_(size[1])
-    height_constraint.setActive_(True)
+    NSLayoutConstraint.activateConstraints_([width_constraint, height_constraint])
     if placeholder:
         text_field.setPlaceholderString_(placeholder)
     if target:
@@ -784,27 +906,46 @@ def menus_from_dict(
         unless the menu item specifies a different target in the MenuItem.target field.
         .When calling this from your app, leave parent = None to add the menu items to the app's top-level menu
     """
-    top_level_menus = {}
-    parent = parent or menu_main()
-    for title, value in menus.items():
-        top_menu = menu_with_submenu(title, parent)
-        top_level_menus[title] = [top_menu]
-        if isinstance(value, Iterable):
-            for item in value:
+    with autorelease_pool():
+        top_level_menus = {}
+        parent = parent or menu_main()
+
+        # menus are built from an explicit stack of (menu, items, children) instead of recursion;
+        # a submenu is added to its parent menu as soon as it is found so item order is preserved
+        # and only the submenu's own items are deferred
+        _menu_with_submenu = menu_with_submenu
+        _menu_item = menu_item
+        stack = []
+        for title, value in menus.items():
+            top_menu = _menu_with_submenu(title, parent)
+            top_level_menus[title] = [top_menu]
+            stack.append((top_menu, value, top_level_menus[title]))
+
+        while stack:
+            menu, items, children = stack.pop()
+            try:
+                items = iter(items)
+            except TypeError:
+                # not iterable so the menu has no items
+                continue
+            for item in items:
                 if isinstance(item, dict):
-                    top_level_menus[title].append(
-                        menus_from_dict(item, target, top_menu)
-                    )
+                    submenus = {}
+                    for title, value in item.items():
+                        submenu = _menu_with_submenu(title, menu)
+                        submenus[title] = [submenu]
+                        stack.append((submenu, value, submenus[title]))
+                    children.append(submenus)
                 else:
-                    child_item = menu_item(
+                    child_item = _menu_item(
                         title=item.title,
-                        parent=top_menu,
+                        parent=menu,
                         action=item.action,
                         target=item.target or target,
                         key=item.key,
                     )
-                    top_level_menus[title].append({item.title: child_item})
-    return top_level_menus
+                    children.append({item.title: child_item})
+        return top_level_menus
 
 
 ################################################################################
@@ -812,10 +953,15 @@ def menus_from_dict(
 ################################################################################
 
 
+@functools.lru_cache(maxsize=32)
+def even_edge_insets(edge_inset: float) -> tuple[float, float, float, float]:
+    """Return NSEdgeInsets (top, left, bottom, right) with the same inset on every edge"""
+    return (edge_inset, edge_inset, edge_inset, edge_inset)
+
+
 def min_with_index(values: list[float]) -> tuple[int, int]:
     """Return the minimum value and index of the minimum value in a list"""
-    min_value = min(values)
-    min_index = values.index(min_value)
+    min_index, min_value = min(enumerate(values), key=operator.itemgetter(1))
     return min_value, min_index
 
 
@@ -829,20 +975,35 @@ def nsdate_to_datetime(nsdate: NSDate):
 
     Note: timezone is the identifier of the timezone to convert to, e.g. "America/New_York" or "US/Eastern"
     """
-    # NSDate's reference date is 2001-01-01 00:00:00 +0000
-    reference_date = datetime.datetime(2001, 1, 1, tzinfo=datetime.timezone.utc)
     seconds_since_ref = nsdate.timeIntervalSinceReferenceDate()
-    dt = reference_date + datetime.timedelta(seconds=seconds_since_ref)
+    dt = NSDATE_REFERENCE_DATE + datetime.timedelta(seconds=seconds_since_ref)
     # all NSDates are naive; use local timezone to adjust from UTC to local
-    timezone = NSTimeZone.localTimeZone().name()
+    tz = zone_info(local_time_zone().name())
+    dt = dt.astimezone(tz=tz)
+    return dt.replace(tzinfo=None)
+
+
+@functools.lru_cache(maxsize=1)
+def local_time_zone() -> NSTimeZone:
+    """Return the local time zone
+
+    Note: localTimeZone returns an auto-updating time zone which always reflects the current
+    system time zone so it is safe to cache even if the user changes the time zone.
+    """
+    return NSTimeZone.localTimeZone()
+
+
+@functools.lru_cache(maxsize=4)
+def zone_info(timezone: str) -> zoneinfo.ZoneInfo:
+    """Return the ZoneInfo for timezone, caching it so the tz database is only read once
+
+    Raises: ValueError if timezone is not a valid timezone
+    """
     try:
-        tz = zoneinfo.ZoneInfo(timezone)
+        return zoneinfo.ZoneInfo(timezone)
     except zoneinfo.ZoneInfoNotFoundError:
         raise ValueError(f"Invalid timezone: {timezone}")
 
-    dt = dt.astimezone(tz=tz)
-    return dt.replace(tzinfo=None)
-
 
 ################################################################################
 # Constraint helper functions
@@ -851,8 +1012,8 @@ def nsdate_to_datetime(nsdate: NSDate):
 
 def set_hugging_priority(
     view: NSView,
-    priority: float = AppKit.NSLayoutPriorityDefaultHigh,
-    orientation: int = AppKit.NSLayoutConstraintOrientationHorizontal,
+    priority: float = NSLayoutPriorityDefaultHigh,
+    orientation: int = NSLayoutConstraintOrientationHorizontal,
 ):
     """Set content hugging priority for a view"""
     view.setContentHuggingPriority_forOrientation_(
@@ -863,19 +1024,58 @@ def set_hugging_priority(
 
 def set_compression_resistance(
     view: NSView,
-    priority: float = AppKit.NSLayoutPriorityDefaultHigh,
-    orientation: int = AppKit.NSLayoutConstraintOrientationHorizontal,
+    priority: float = NSLayoutPriorityDefaultHigh,
+    orientation: int = NSLayoutConstraintOrientationHorizontal,
 ):
     """Set content compression resistance for a view"""
     view.setContentCompressionResistancePriority_forOrientation_(priority, orientation)
 
 
+def activate_constraints(
+    new_constraints: list[AppKit.NSLayoutConstraint],
+    constraints: list[AppKit.NSLayoutConstraint] | None = None,
+):
+    """Activate new_constraints all at once or add them to constraints to be activated later
+
+    Args:
+        new_constraints: list of NSLayoutConstraints
+        constraints: if a list is provided, new_constraints are appended to it instead of being activated
+
+    Note: activating constraints together is faster than activating them one at a time as the
+    layout engine is only updated once; the constrain_* functions accept a constraints list
+    so that the constraints for a whole window can be collected and activated with one call.
+    """
+    if constraints is None:
+        NSLayoutConstraint.activateConstraints_(new_constraints)
+    else:
+        constraints.extend(new_constraints)
+
+
+# anchor getters and dimension for the axis the stacks are laid out along:
+# (leading, trailing, cross axis leading, cross axis trailing, dimension)
+_HORIZONTAL_STACK_AXIS = (
+    operator.methodcaller("leadingAnchor"),
+    operator.methodcaller("trailingAnchor"),
+    operator.methodcaller("topAnchor"),
+    operator.methodcaller("bottomAnchor"),
+    NSLayoutAttributeWidth,
+)
+_VERTICAL_STACK_AXIS = (
+    operator.methodcaller("topAnchor"),
+    operator.methodcaller("bottomAnchor"),
+    operator.methodcaller("leadingAnchor"),
+    operator.methodcaller("trailingAnchor"),
+    NSLayoutAttributeHeight,
+)
+
+
 def constrain_stacks_side_by_side(
     *stacks: NSStackView,
     weights: list[float] | None = None,
     parent: NSStackView | None = None,
     padding: int = 0,
     edge_inset: float = 0,
+    constraints: list[AppKit.NSLayoutConstraint] | None = None,
 ):
     """Constrain a list of NSStackViews to be side by side optionally using weighted widths
 
@@ -885,6 +1085,7 @@ def constrain_stacks_side_by_side(
         parent: NSStackView to constrain the stacks to; if None, uses stacks[0].superview()
         padding: padding between stacks
         edge_inset: padding between stacks and parent
+        constraints: optional list to append the new constraints to instead of activating them
 
 
     Note:
@@ -893,52 +1094,15 @@ def constrain_stacks_side_by_side(
         weights = [1, 2], the first stack will be half the width of the second stack.
     """
 
-    if len(stacks) < 2:
-        raise ValueError("Must provide at least two stacks")
-
-    parent = parent or stacks[0].superview()
-
-    if weights is not None:
-        min_weight, min_index = min_with_index(weights)
-    else:
-        min_weight, min_index = 1.0, 0
-
-    for i, stack in enumerate(stacks):
-        if i == 0:
-            stack.leadingAnchor().constraintEqualToAnchor_constant_(
-                parent.leadingAnchor(), edge_inset
-            ).setActive_(True)
-        else:
-            stack.leadingAnchor().constraintEqualToAnchor_constant_(
-                stacks[i - 1].trailingAnchor(), padding
-            ).setActive_(True)
-        if i == len(stacks) - 1:
-            stack.trailingAnchor().constraintEqualToAnchor_constant_(
-                parent.trailingAnchor(), -edge_inset
-            ).setActive_(True)
-        stack.topAnchor().constraintEqualToAnchor_constant_(
-            parent.topAnchor(), edge_inset
-        ).setActive_(True)
-        stack.bottomAnchor().constraintEqualToAnchor_constant_(
-            parent.bottomAnchor(), -edge_inset
-        ).setActive_(True)
-
-        if not weights:
-            continue
-
-        weight = weights[i] / min_weight
-
-        AppKit.NSLayoutConstraint.constraintWithItem_attribute_relatedBy_toItem_attribute_multiplier_constant_(
-            stack,
-            AppKit.NSLayoutAttributeWidth,
-            AppKit.NSLayoutRelationEqual,
-            stacks[min_index],
-            AppKit.NSLayoutAttributeWidth,
-            weight,
-            0.0,
-        ).setActive_(
-            True
-        )
+    _constrain_stacks(
+        stacks,
+        weights,
+        parent,
+        padding,
+        edge_inset,
+        constraints,
+        _HORIZONTAL_STACK_AXIS,
+    )
 
 
 def constrain_stacks_top_to_bottom(
@@ -947,6 +1111,7 @@ def constrain_stacks_top_to_bottom(
     parent: NSStackView | None = None,
     padding: int = 0,
     edge_inset: float = 0,
+    constraints: list[AppKit.NSLayoutConstraint] | None = None,
 ):
     """Constrain a list of NSStackViews to be top to bottom optionally using weighted widths
 
@@ -956,6 +1121,7 @@ def constrain_stacks_top_to_bottom(
         parent: NSStackView to constrain the stacks to; if None, uses stacks[0].superview()
         padding: padding between stacks
         edge_inset: padding between stacks and parent
+        constraints: optional list to append the new constraints to instead of activating them
 
 
     Note:
@@ -964,56 +1130,97 @@ def constrain_stacks_top_to_bottom(
         weights = [1, 2], the first stack will be half the width of the second stack.
     """
 
-    if len(stacks) < 2:
+    _constrain_stacks(
+        stacks, weights, parent, padding, edge_inset, constraints, _VERTICAL_STACK_AXIS
+    )
+
+
+def _constrain_stacks(
+    stacks: tuple[NSStackView, ...],
+    weights: list[float] | None,
+    parent: NSStackView | None,
+    padding: int,
+    edge_inset: float,
+    constraints: list[AppKit.NSLayoutConstraint] | None,
+    axis: tuple,
+):
+    """Constrain stacks one after the other along axis, one of the _*_STACK_AXIS tuples
+
+    See constrain_stacks_side_by_side() for the other arguments.
+    """
+    n = len(stacks)
+    if n < 2:
         raise ValueError("Must provide at least two stacks")
+    if weights and len(weights) != n:
+        raise ValueError("Must provide one weight for each stack")
+    last = n - 1
 
     parent = parent or stacks[0].superview()
+    new_constraints = []
 
-    if weights is not None:
-        min_weight, min_index = min_with_index(weights)
-    else:
-        min_weight, min_index = 1.0, 0
+    lead_anchor, trail_anchor, cross_lead_anchor, cross_trail_anchor, dimension = axis
 
+    # get each anchor once; the previous stack's trailing anchor is reused for the next stack
+    parent_lead = lead_anchor(parent)
+    parent_trail = trail_anchor(parent)
+    parent_cross_lead = cross_lead_anchor(parent)
+    parent_cross_trail = cross_trail_anchor(parent)
+    previous_trail = None
     for i, stack in enumerate(stacks):
+        lead = lead_anchor(stack)
+        trail = trail_anchor(stack)
         if i == 0:
-            stack.topAnchor().constraintEqualToAnchor_constant_(
-                parent.topAnchor(), edge_inset
-            ).setActive_(True)
+            new_constraints.append(
+                lead.constraintEqualToAnchor_constant_(parent_lead, edge_inset)
+            )
         else:
-            stack.topAnchor().constraintEqualToAnchor_constant_(
-                stacks[i - 1].bottomAnchor(), padding
-            ).setActive_(True)
-        if i == len(stacks) - 1:
-            stack.bottomAnchor().constraintEqualToAnchor_constant_(
-                parent.bottomAnchor(), -edge_inset
-            ).setActive_(True)
-        stack.leadingAnchor().constraintEqualToAnchor_constant_(
-            parent.leadingAnchor(), edge_inset
-        ).setActive_(True)
-        stack.trailingAnchor().constraintEqualToAnchor_constant_(
-            parent.trailingAnchor(), -edge_inset
-        ).setActive_(True)
-
-        if not weights:
-            continue
-
-        weight = weights[i] / min_weight
-
-        AppKit.NSLayoutConstraint.constraintWithItem_attribute_relatedBy_toItem_attribute_multiplier_constant_(
-            stack,
-            AppKit.NSLayoutAttributeHeight,
-            AppKit.NSLayoutRelationEqual,
-            stacks[min_index],
-            AppKit.NSLayoutAttributeHeight,
-            weight,
-            0.0,
-        ).setActive_(
-            True
+            new_constraints.append(
+                lead.constraintEqualToAnchor_constant_(previous_trail, padding)
+            )
+        if i == last:
+            new_constraints.append(
+                trail.constraintEqualToAnchor_constant_(parent_trail, -edge_inset)
+            )
+        previous_trail = trail
+        new_constraints.append(
+            cross_lead_anchor(stack).constraintEqualToAnchor_constant_(
+                parent_cross_lead, edge_inset
+            )
         )
+        new_constraints.append(
+            cross_trail_anchor(stack).constraintEqualToAnchor_constant_(
+                parent_cross_trail, -edge_inset
+            )
+        )
+
+    if weights:
+        # size each stack relative to the stack with the smallest weight
+        min_weight, min_index = min_with_index(weights)
+        min_stack = stacks[min_index]
+        constraint_with_item = (
+            NSLayoutConstraint.constraintWithItem_attribute_relatedBy_toItem_attribute_multiplier_constant_
+        )
+        for stack, weight in zip(stacks, weights):
+            new_constraints.append(
+                constraint_with_item(
+                    stack,
+                    dimension,
+                    NSLayoutRelationEqual,
+                    min_stack,
+                    dimension,
+                    weight / min_weight,
+                    0.0,
+                )
+            )
+
+    activate_constraints(new_constraints, constraints)
 
 
 def constrain_to_parent_width(
-    view: NSView, parent: NSView | None = None, edge_inset: float = 0
+    view: NSView,
+    parent: NSView | None = None,
+    edge_inset: float = 0,
+    constraints: list[AppKit.NSLayoutConstraint] | None = None,
 ):
     """Constrain an NSView to the width of its parent
 
@@ -1021,66 +1228,101 @@ def constrain_to_parent_width(
         view: NSView to constrain
         parent: NSView to constrain the control to; if None, uses view.superview()
         edge_inset: margin between control and parent
+        constraints: optional list to append the new constraints to instead of activating them
     """
     parent = parent or view.superview()
-    view.rightAnchor().constraintEqualToAnchor_constant_(
-        parent.rightAnchor(), -edge_inset
-    ).setActive_(True)
-    view.leftAnchor().constraintEqualToAnchor_constant_(
-        parent.leftAnchor(), edge_inset
-    ).setActive_(True)
+    activate_constraints(
+        [
+            view.rightAnchor().constraintEqualToAnchor_constant_(
+                parent.rightAnchor(), -edge_inset
+            ),
+            view.leftAnchor().constraintEqualToAnchor_constant_(
+                parent.leftAnchor(), edge_inset
+            ),
+        ],
+        constraints,
+    )
 
 
-def constrain_to_width(view: NSView, width: float | None = None):
+def constrain_to_width(
+    view: NSView,
+    width: float | None = None,
+    constraints: list[AppKit.NSLayoutConstraint] | None = None,
+):
     """Constrain an NSView to a fixed width
 
     Args:
         view: NSView to constrain
         width: width to constrain to; if None, does not apply a width constraint
+        constraints: optional list to append the new constraints to instead of activating them
     """
     if width is not None:
-        view.widthAnchor().constraintEqualToConstant_(width).setActive_(True)
+        activate_constraints(
+            [view.widthAnchor().constraintEqualToConstant_(width)], constraints
+        )
 
 
-def constrain_to_height(view: NSView, height: float | None = None):
+def constrain_to_height(
+    view: NSView,
+    height: float | None = None,
+    constraints: list[AppKit.NSLayoutConstraint] | None = None,
+):
     """Constrain an NSView to a fixed height
 
     Args:
         view: NSView to constrain
         height: height to constrain to; if None, does not apply a height constraint
+        constraints: optional list to append the new constraints to instead of activating them
     """
     if height is not None:
-        view.heightAnchor().constraintEqualToConstant_(height).setActive_(True)
+        activate_constraints(
+            [view.heightAnchor().constraintEqualToConstant_(height)], constraints
+        )
 
 
-def constrain_center_x_to_parent(view: NSView, parent: NSView | None = None):
+def constrain_center_x_to_parent(
+    view: NSView,
+    parent: NSView | None = None,
+    constraints: list[AppKit.NSLayoutConstraint] | None = None,
+):
     """Constrain an NSView to the center of its parent along the x-axis
 
     Args:
         view: NSView to constrain
         parent: NSView to constrain the control to; if None, uses view.superview()
+        constraints: optional list to append the new constraints to instead of activating them
     """
     parent = parent or view.superview()
-    view.centerXAnchor().constraintEqualToAnchor_(parent.centerXAnchor()).setActive_(
-        True
+    activate_constraints(
+        [view.centerXAnchor().constraintEqualToAnchor_(parent.centerXAnchor())],
+        constraints,
     )
 
 
-def constrain_center_y_to_parent(view: NSView, parent: NSView | None = None):
+def constrain_center_y_to_parent(
+    view: NSView,
+    parent: NSView | None = None,
+    constraints: list[AppKit.NSLayoutConstraint] | None = None,
+):
     """Constrain an NSView to the center of its parent along the y-axis
 
     Args:
         view: NSView to constrain
         parent: NSView to constrain the control to; if None, uses view.superview()
+        constraints: optional list to append the new constraints to instead of activating them
     """
     parent = parent or view.superview()
-    view.centerYAnchor().constraintEqualToAnchor_(parent.centerYAnchor()).setActive_(
-        True
+    activate_constraints(
+        [view.centerYAnchor().constraintEqualToAnchor_(parent.centerYAnchor())],
+        constraints,
     )
 
 
 def constrain_trailing_anchor_to_parent(
-    view: NSView, parent: NSView | None = None, edge_inset: float = EDGE_INSET
+    view: NSView,
+    parent: NSView | None = None,
+    edge_inset: float = EDGE_INSET,
+    constraints: list[AppKit.NSLayoutConstraint] | None = None,
 ):
     """Constrain an NSView's trailing anchor to it's parent
 
@@ -1088,8 +1330,14 @@ def constrain_trailing_anchor_to_parent(
         view: NSView to constrain
         parent: NSView to constrain the control to; if None, uses view.superview()
         inset: inset from trailing edge to apply to constraint (inset will be subtracted from trailing edge)
+        constraints: optional list to append the new constraints to instead of activating them
     """
     parent = parent or view.superview()
-    view.trailingAnchor().constraintEqualToAnchor_constant_(
-        parent.trailingAnchor(), -edge_inset
-    ).setActive_(True)
+    activate_constraints(
+        [
+            view.trailingAnchor().constraintEqualToAnchor_constant_(
+                parent.trailingAnchor(), -edge_inset
+            )
+        ],
+        constraints,
+    )
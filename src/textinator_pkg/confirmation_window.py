@@ -4,17 +4,23 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import AppKit
 import objc
-from AppKit import NSObject, NSWindow
+from AppKit import (
+    NSFloatingWindowLevel,
+    NSLayoutAttributeCenterY,
+    NSObject,
+    NSWindow,
+    NSWindowStyleMaskClosable,
+    NSWindowStyleMaskTitled,
+)
 from Foundation import NSLog
 from objc import python_method
 
-import appkitgui as gui
-from pasteboard import Pasteboard
+from . import appkitgui as gui
+from .pasteboard import Pasteboard
 
 if TYPE_CHECKING:
-    from textinator import Textinator
+    from .app import Textinator
 
 # constants
 EDGE_INSET = 20
@@ -28,10 +34,15 @@ class ConfirmationWindow(NSObject):
     """Confirmation Window to confirm text before copying to clipboard"""
 
     def init(self):
-        """Initialize the ConfirmationWindow"""
+        """Initialize the ConfirmationWindow
+
+        The window is created (but not shown) here so that showing it the first time is fast
+        """
         self = objc.super(ConfirmationWindow, self).init()
         if self is None:
             return None
+        with objc.autorelease_pool():
+            self.create_window()
         return self
 
     @python_method
@@ -42,18 +53,26 @@ class ConfirmationWindow(NSObject):
         self.window = gui.window(
             "Textinator",
             (WINDOW_WIDTH, WINDOW_HEIGHT),
-            mask=AppKit.NSWindowStyleMaskTitled | AppKit.NSWindowStyleMaskClosable,
+            mask=NSWindowStyleMaskTitled | NSWindowStyleMaskClosable,
         )
+        # the window is reused so it must not be released when closed with the close button
+        self.window.setReleasedWhenClosed_(False)
+        self.window.setLevel_(NSFloatingWindowLevel + 1)
         self.main_view = gui.main_view(
             self.window, padding=PADDING, edge_inset=EDGE_INSETS
         )
 
+        # collect the constraints and activate them all at once after the views are created
+        constraints = []
+
         self.text_view = gui.text_view(
             size=(WINDOW_WIDTH - 2 * EDGE_INSET, WINDOW_HEIGHT - 50)
         )
         self.main_view.append(self.text_view)
-        gui.constrain_to_parent_width(self.text_view, edge_inset=EDGE_INSET)
-        self.hstack = gui.hstack(align=AppKit.NSLayoutAttributeCenterY)
+        gui.constrain_to_parent_width(
+            self.text_view, edge_inset=EDGE_INSET, constraints=constraints
+        )
+        self.hstack = gui.hstack(align=NSLayoutAttributeCenterY)
         self.main_view.append(self.hstack)
         self.button_cancel = gui.button("Cancel", self, self.buttonCancel_)
         self.button_copy = gui.button(
@@ -62,37 +81,39 @@ class ConfirmationWindow(NSObject):
         self.button_copy.setKeyEquivalent_("\r")  # Return key
         self.button_copy.setKeyEquivalentModifierMask_(0)  # No modifier keys
         self.hstack.extend([self.button_cancel, self.button_copy])
-        gui.constrain_trailing_anchor_to_parent(self.hstack, edge_inset=EDGE_INSET)
+        gui.constrain_trailing_anchor_to_parent(
+            self.hstack, edge_inset=EDGE_INSET, constraints=constraints
+        )
+        gui.activate_constraints(constraints)
 
     @python_method
     def show(self, text: str, app: Textinator):
-        """Create and show the window"""
-
-        if not hasattr(self, "window"):
-            self.create_window()
-
+        """Show the window"""
         self.app = app
         self.log = app.log
 
         with objc.autorelease_pool():
-            self.log(f"Showing confirmation window with text: {text}")
-            self.text_view.setString_(text)
+            if app.debug:
+                self.log(f"Showing confirmation window with text: {text}")
+            else:
+                self.log("Showing confirmation window")
+            # compare with what's shown rather than what was last set as the user may have edited it
+            if text != self.text_view.string():
+                self.text_view.setString_(text)
             self.window.makeKeyAndOrderFront_(None)
-            self.window.setIsVisible_(True)
-            self.window.setLevel_(AppKit.NSFloatingWindowLevel + 1)
-            self.window.setReleasedWhenClosed_(False)
             self.window.makeFirstResponder_(self.button_copy)
             return self.window
 
     def buttonCancel_(self, sender):
         """Cancel button action"""
         self.log("Cancel button clicked, closing window without copying text")
-        self.window.close()
+        self.window.orderOut_(None)
 
     def buttonCopyToClipboard_(self, sender):
         """Copy to clipboard button action"""
         text = self.text_view.string()
-        self.log(f"Text to copy: {text}")
+        if self.app.debug:
+            self.log(f"Text to copy: {text}")
         if self.app.append.state:
             clipboard_text = (
                 self.app.pasteboard.paste() if self.app.pasteboard.has_text() else ""
@@ -100,6 +121,7 @@ class ConfirmationWindow(NSObject):
             clipboard_text = f"{clipboard_text}\n{text}" if clipboard_text else text
         else:
             clipboard_text = text
-        self.log(f"Setting clipboard text to: {clipboard_text}")
+        if self.app.debug:
+            self.log(f"Setting clipboard text to: {clipboard_text}")
         self.app.pasteboard.copy(clipboard_text)
-        self.window.close()
+        self.window.orderOut_(None)
@@ -0,0 +1,72 @@
+"""Utilities for working with System Preferences > Users & Groups > Login Items on macOS."""
+
+import functools
+from typing import Iterable, List, Tuple
+
+import applescript
+
+__all__ = ["add_login_item", "add_login_items", "list_login_items", "remove_login_item"]
+
+# The following functions are used to manipulate the Login Items list in System Preferences
+# To use these, your app must include the com.apple.security.automation.apple-events entitlement
+# in its entitlements file during signing and must have the NSAppleEventsUsageDescription key in
+# its Info.plist file
+# These functions use AppleScript to interact with System Preferences. I know of no other way to
+# do this programmatically from Python.  If you know of a better way, please let me know!
+
+
+# handlers for working with login items; arguments are passed to the handlers as AppleScript
+# values so they don't need to be quoted or escaped and the script only needs to be compiled once
+LOGIN_ITEMS_SCRIPT = """
+on add_login_item(app_name, app_path, is_hidden)
+    tell application "System Events" to make login item at end with properties {name:app_name, path:app_path, hidden:is_hidden}
+end add_login_item
+
+on add_login_items(item_list)
+    tell application "System Events"
+        repeat with item_info in item_list
+            make login item at end with properties {name:item 1 of item_info, path:item 2 of item_info, hidden:item 3 of item_info}
+        end repeat
+    end tell
+end add_login_items
+
+on remove_login_item(app_name)
+    tell application "System Events" to delete login item app_name
+end remove_login_item
+
+on list_login_items()
+    tell application "System Events" to get the name of every login item
+end list_login_items
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _login_items_script() -> applescript.AppleScript:
+    """Return the compiled login items script, compiling it on first use"""
+    return applescript.AppleScript(LOGIN_ITEMS_SCRIPT)
+
+
+def add_login_item(app_name: str, app_path: str, hidden: bool = False):
+    """Add app to login items"""
+    _login_items_script().call("add_login_item", app_name, app_path, hidden)
+
+
+def add_login_items(items: Iterable[Tuple[str, str, bool]]):
+    """Add several apps to login items with a single call to System Events
+
+    Args:
+        items: iterable of (app_name, app_path, hidden) tuples
+    """
+    item_list = [[app_name, app_path, hidden] for app_name, app_path, hidden in items]
+    if item_list:
+        _login_items_script().call("add_login_items", item_list)
+
+
+def remove_login_item(app_name: str):
+    """Remove app from login items"""
+    _login_items_script().call("remove_login_item", app_name)
+
+
+def list_login_items() -> List[str]:
+    """Return list of login items"""
+    return _login_items_script().call("list_login_items")
@@ -0,0 +1,391 @@
+"""Use macOS Vision API to detect text and QR codes in images"""
+
+import concurrent.futures
+import functools
+from typing import List, Optional, Tuple
+
+import objc
+import Quartz
+import Vision
+from Foundation import NSURL, NSArray, NSData, NSDictionary, NSLog
+from Quartz import CIImage
+from Vision import (
+    VNBarcodeSymbologyQR,
+    VNDetectBarcodesRequest,
+    VNImageRequestHandler,
+    VNRecognizeTextRequest,
+    VNRequestTextRecognitionLevelAccurate,
+)
+
+from .utils import get_mac_os_version
+
+__all__ = [
+    "ciimage_from_data",
+    "ciimage_from_file",
+    "ciimage_from_url",
+    "detect_qrcodes_in_ciimage",
+    "detect_qrcodes_in_file",
+    "detect_text_and_qrcodes_in_ciimage",
+    "detect_text_and_qrcodes_in_ciimage_async",
+    "detect_text_and_qrcodes_in_file",
+    "detect_text_in_ciimage",
+    "detect_text_in_ciimage_async",
+    "detect_text_in_file",
+    "get_supported_vision_languages",
+]
+
+# the OS version can't change while the app is running so only look it up once
+_MAC_OS_VERSION = get_mac_os_version()
+
+# latest VNRecognizeTextRequest revision available on this version of macOS
+_TEXT_REQUEST_REVISION = (
+    Vision.VNRecognizeTextRequestRevision2
+    if _MAC_OS_VERSION >= ("11", "0", "0")
+    else Vision.VNRecognizeTextRequestRevision1
+)
+
+# options don't change between calls so the NSDictionary is created once
+_EMPTY_OPTIONS = NSDictionary.dictionary()
+
+
+@functools.lru_cache(maxsize=1)
+def get_supported_vision_languages() -> Tuple[Tuple[str], Tuple[str]]:
+    """Get supported languages for text detection from Vision framework.
+
+    Returns: Tuple of ((language code), (error))
+
+    Note: the result is cached as the supported languages don't change while the app is running
+    """
+
+    with objc.autorelease_pool():
+        if _MAC_OS_VERSION < ("12", "0", "0"):
+            return VNRecognizeTextRequest.supportedRecognitionLanguagesForTextRecognitionLevel_revision_error_(
+                VNRequestTextRecognitionLevelAccurate,
+                _TEXT_REQUEST_REVISION,
+                None,
+            )
+
+        results = []
+        handler = make_request_handler(results)
+        textRequest = VNRecognizeTextRequest.alloc().initWithCompletionHandler_(handler)
+        return textRequest.supportedRecognitionLanguagesAndReturnError_(None)
+
+
+def ciimage_from_file(filepath: str) -> Quartz.CIImage:
+    """Create a Quartz.CIImage from a file
+
+    Args:
+        filepath: path to the image file
+
+    Returns:
+        Quartz.CIImage
+    """
+    with objc.autorelease_pool():
+        input_url = _file_url(filepath)
+        return CIImage.imageWithContentsOfURL_(input_url)
+
+
+def ciimage_from_url(url: NSURL) -> Quartz.CIImage:
+    """Create a Quartz.CIImage from a file URL
+
+    Args:
+        url: NSURL of the image file
+
+    Returns:
+        Quartz.CIImage
+    """
+    return CIImage.imageWithContentsOfURL_(url)
+
+
+def ciimage_from_data(data: NSData) -> Quartz.CIImage:
+    """Create a Quartz.CIImage from image data, e.g. from the clipboard
+
+    Args:
+        data: NSData containing the image
+
+    Returns:
+        Quartz.CIImage
+    """
+    return CIImage.imageWithData_(data)
+
+
+@functools.lru_cache(maxsize=64)
+def _file_url(filepath: str) -> NSURL:
+    """Return a file NSURL for filepath; cached as the same file is often processed more than once"""
+    # passing isDirectory avoids a file system check to determine whether filepath is a directory
+    return NSURL.fileURLWithPath_isDirectory_(filepath, False)
+
+
+def detect_text_in_file(
+    img_path: str,
+    orientation: Optional[int] = None,
+    languages: Optional[List[str]] = None,
+) -> List[Tuple[str, float]]:
+    """process image file at img_path with VNRecognizeTextRequest and return list of results
+
+    Args:
+        img_path: path to the image file
+        orientation: optional EXIF orientation (if known, passing orientation may improve quality of results)
+        languages: optional languages to use for text detection as list of ISO language code strings; default is ["en-US"]
+
+    Returns:
+        List of results where each result is a tuple of (text, confidence)
+    """
+    input_image = ciimage_from_file(img_path)
+    return detect_text_in_ciimage(input_image, orientation, languages)
+
+
+def detect_text_and_qrcodes_in_file(
+    img_path: str,
+    orientation: Optional[int] = None,
+    languages: Optional[List[str]] = None,
+) -> Tuple[List[Tuple[str, float]], List[str]]:
+    """Detect text and QR codes in image file at img_path, loading the image only once
+
+    Args:
+        img_path: path to the image file
+        orientation: optional EXIF orientation (if known, passing orientation may improve quality of results)
+        languages: optional languages to use for text detection as list of ISO language code strings; default is ["en-US"]
+
+    Returns:
+        Tuple of (text results, QR code results) where text results is a list of (text, confidence) tuples
+        and QR code results is a list of QR code payload texts
+    """
+    input_image = ciimage_from_file(img_path)
+    return detect_text_and_qrcodes_in_ciimage(input_image, orientation, languages)
+
+
+def detect_text_and_qrcodes_in_ciimage(
+    image: Quartz.CIImage,
+    orientation: Optional[int] = None,
+    languages: Optional[List[str]] = None,
+) -> Tuple[List[Tuple[str, float]], List[str]]:
+    """Detect text and QR codes in a CIImage with a single Vision request handler
+
+    Args:
+        image: CIIImage to process
+        orientation: optional EXIF orientation (if known, passing orientation may improve quality of results)
+        languages: optional languages to use for text detection as list of ISO language code strings; default is ["en-US"]
+
+    Returns:
+        Tuple of (text results, QR code results) where text results is a list of (text, confidence) tuples
+        and QR code results is a list of QR code payload texts
+    """
+    with objc.autorelease_pool():
+        text_results = []
+        qrcode_results = []
+        perform_vision_requests(
+            image,
+            orientation,
+            [
+                make_text_request(text_results, languages),
+                make_qrcode_request(qrcode_results),
+            ],
+        )
+        return text_results, qrcode_results
+
+
+def detect_text_in_ciimage(
+    image: Quartz.CIImage,
+    orientation: Optional[int] = None,
+    languages: Optional[List[str]] = None,
+) -> List[Tuple[str, float]]:
+    """process CIImage with VNRecognizeTextRequest and return list of results
+
+    This code originally developed for https://github.com/RhetTbull/osxphotos
+
+    Args:
+        image: CIIImage to process
+        orientation: optional EXIF orientation (if known, passing orientation may improve quality of results)
+        languages: optional languages to use for text detection as list of ISO language code strings; default is ["en-US"]
+
+    Returns:
+        List of results where each result is a tuple of (text, confidence)
+    """
+    with objc.autorelease_pool():
+        results = []
+        perform_vision_requests(
+            image, orientation, [make_text_request(results, languages)]
+        )
+        return results
+
+
+def detect_text_in_ciimage_async(
+    image: Quartz.CIImage,
+    orientation: Optional[int] = None,
+    languages: Optional[List[str]] = None,
+) -> concurrent.futures.Future:
+    """Run detect_text_in_ciimage on a background thread so the caller isn't blocked
+
+    Args:
+        image: CIIImage to process
+        orientation: optional EXIF orientation (if known, passing orientation may improve quality of results)
+        languages: optional languages to use for text detection as list of ISO language code strings; default is ["en-US"]
+
+    Returns:
+        Future whose result is the list of (text, confidence) tuples returned by detect_text_in_ciimage
+
+    Note: requests are run one at a time in the order they're submitted; the future's callbacks
+    run on the background thread so any UI work must be dispatched back to the main thread
+    """
+    return _vision_executor().submit(
+        detect_text_in_ciimage, image, orientation, languages
+    )
+
+
+def detect_text_and_qrcodes_in_ciimage_async(
+    image: Quartz.CIImage,
+    orientation: Optional[int] = None,
+    languages: Optional[List[str]] = None,
+) -> concurrent.futures.Future:
+    """Run detect_text_and_qrcodes_in_ciimage on a background thread so the caller isn't blocked
+
+    Args:
+        image: CIIImage to process
+        orientation: optional EXIF orientation (if known, passing orientation may improve quality of results)
+        languages: optional languages to use for text detection as list of ISO language code strings; default is ["en-US"]
+
+    Returns:
+        Future whose result is the (text results, QR code results) tuple returned by
+        detect_text_and_qrcodes_in_ciimage
+
+    Note: runs on the same background thread as detect_text_in_ciimage_async so all requests
+    are run one at a time in the order they're submitted
+    """
+    return _vision_executor().submit(
+        detect_text_and_qrcodes_in_ciimage, image, orientation, languages
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _vision_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Return the executor for background Vision requests, created on first use"""
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="textinator-vision"
+    )
+
+
+def perform_vision_requests(
+    image: Quartz.CIImage, orientation: Optional[int], requests: List[Vision.VNRequest]
+):
+    """Perform Vision requests on image with a single VNImageRequestHandler
+
+    Args:
+        image: CIIImage to process
+        orientation: optional EXIF orientation
+        requests: list of VNRequests to perform
+
+    Raises:
+        ValueError if orientation is invalid or the requests failed
+    """
+    vision_options = _EMPTY_OPTIONS
+    if orientation is None:
+        vision_handler = VNImageRequestHandler.alloc().initWithCIImage_options_(
+            image, vision_options
+        )
+    elif 1 <= orientation <= 8:
+        vision_handler = (
+            VNImageRequestHandler.alloc().initWithCIImage_orientation_options_(
+                image, orientation, vision_options
+            )
+        )
+    else:
+        raise ValueError("orientation must be between 1 and 8")
+    success, error = vision_handler.performRequests_error_(requests, None)
+    if not success:
+        raise ValueError(f"Vision request failed: {error}")
+
+
+def make_text_request(
+    results: List[Tuple[str, float]], languages: Optional[List[str]] = None
+) -> Vision.VNRecognizeTextRequest:
+    """Create a VNRecognizeTextRequest that stores its results in results
+
+    Args:
+        results: list to store results as (text, confidence) tuples
+        languages: optional languages to use for text detection as list of ISO language code strings; default is ["en-US"]
+    """
+    handler = make_request_handler(results)
+    vision_request = VNRecognizeTextRequest.alloc().initWithCompletionHandler_(handler)
+    vision_request.setRecognitionLanguages_(
+        _recognition_languages(tuple(languages or ("en-US",)))
+    )
+    vision_request.setUsesLanguageCorrection_(True)
+    return vision_request
+
+
+@functools.lru_cache(maxsize=16)
+def _recognition_languages(languages: Tuple[str, ...]) -> NSArray:
+    """Return languages as an NSArray; cached so the same languages aren't bridged on every request"""
+    return NSArray.arrayWithArray_(languages)
+
+
+def make_request_handler(results):
+    """results: list to store results as (text, confidence) tuples"""
+    if not isinstance(results, list):
+        raise ValueError("results must be a list")
+
+    def handler(request, error):
+        if error:
+            NSLog("Error! %@", error)
+        else:
+            observations = request.results()
+            for text_observation in observations:
+                recognized_text = text_observation.topCandidates_(1)[0]
+                results.append(
+                    (str(recognized_text.string()), float(recognized_text.confidence()))
+                )
+
+    return handler
+
+
+def make_qrcode_request(results: List[str]) -> Vision.VNDetectBarcodesRequest:
+    """Create a VNDetectBarcodesRequest for QR codes that stores the QR code payloads in results
+
+    Args:
+        results: list to store QR code payload texts
+    """
+
+    def handler(request, error):
+        if error:
+            NSLog("Error! %@", error)
+        else:
+            for observation in request.results():
+                # payload may be None if the QR code couldn't be decoded
+                payload = observation.payloadStringValue()
+                if payload is not None:
+                    results.append(str(payload))
+
+    vision_request = VNDetectBarcodesRequest.alloc().initWithCompletionHandler_(handler)
+    vision_request.setSymbologies_([VNBarcodeSymbologyQR])
+    return vision_request
+
+
+def detect_qrcodes_in_file(img_path: str) -> List[str]:
+    """Detect QR Codes in image files using VNDetectBarcodesRequest and return text of the found QR Codes
+
+    Args:
+        img_path: path to the image file
+
+    Returns:
+        List of QR Code payload texts found in the image
+    """
+
+    input_image = ciimage_from_file(img_path)
+    return detect_qrcodes_in_ciimage(input_image)
+
+
+def detect_qrcodes_in_ciimage(image: Quartz.CIImage) -> List[str]:
+    """Detect QR Codes in image using VNDetectBarcodesRequest and return text of the found QR Codes
+
+    Args:
+        input_image: CIImage to process
+
+    Returns:
+        List of QR Code payload texts found in the image
+    """
+
+    with objc.autorelease_pool():
+        results = []
+        perform_vision_requests(image, None, [make_qrcode_request(results)])
+        return results
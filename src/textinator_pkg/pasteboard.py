@@ -14,11 +14,19 @@ import typing as t
 
 from AppKit import (
     NSPasteboard,
+    NSPasteboardItem,
     NSPasteboardTypePNG,
     NSPasteboardTypeString,
     NSPasteboardTypeTIFF,
 )
-from Foundation import NSData
+from Foundation import (
+    NSArray,
+    NSData,
+    NSDataReadingMappedIfSafe,
+    NSDataWritingAtomic,
+    NSMutableString,
+)
+from objc import autorelease_pool
 
 # shortcuts for types
 PNG = "PNG"
@@ -26,6 +34,17 @@ TIFF = "TIFF"
 
 __all__ = ["Pasteboard", "PasteboardTypeError", "PNG", "TIFF"]
 
+# arrays of pasteboard types to check for, created once instead of bridging a list on every check
+_PNG_TYPES = NSArray.arrayWithObject_(NSPasteboardTypePNG)
+_TIFF_TYPES = NSArray.arrayWithObject_(NSPasteboardTypeTIFF)
+_IMAGE_TYPES = NSArray.arrayWithArray_([NSPasteboardTypeTIFF, NSPasteboardTypePNG])
+
+# the first bytes of every PNG file
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# pasteboard type for each supported image format
+_FORMAT_TYPES = {PNG: NSPasteboardTypePNG, TIFF: NSPasteboardTypeTIFF}
+
 
 class PasteboardError(Exception):
     """Base class for Pasteboard exceptions"""
@@ -44,7 +63,9 @@ class Pasteboard:
 
     def __init__(self):
         self.pasteboard = NSPasteboard.generalPasteboard()
-        self._change_count = self.pasteboard.changeCount()
+        # has_changed() is polled frequently so look up the changeCount method only once
+        self._pasteboard_change_count = self.pasteboard.changeCount
+        self._change_count = self._pasteboard_change_count()
 
     def copy(self, text):
         """Copy text to clipboard
@@ -67,13 +88,17 @@ class Pasteboard:
         Args:
             text (str): Text to append to clipboard
         """
-        new_text = self.get_text() + text
+        # append in an NSMutableString so the combined text isn't built as a new python str
+        new_text = NSMutableString.stringWithString_(
+            self.pasteboard.stringForType_(NSPasteboardTypeString) or ""
+        )
+        new_text.appendString_(text)
         self.set_text(new_text)
 
     def clear(self):
         """Clear Clipboard"""
         self.pasteboard.clearContents()
-        self._change_count = self.pasteboard.changeCount()
+        self._change_count = self._pasteboard_change_count()
 
     def copy_image(self, filename: t.Union[str, os.PathLike], format: str):
         """Copy image to clipboard from filename
@@ -82,8 +107,6 @@ class Pasteboard:
             filename (os.PathLike): Filename of image to copy to clipboard
             format (str): Format of image to copy, "PNG" or "TIFF"
         """
-        if not isinstance(filename, str):
-            filename = str(filename)
         self.set_image(filename, format)
 
     def paste_image(
@@ -102,8 +125,6 @@ class Pasteboard:
         Raises:
             FileExistsError: If file exists and overwrite is False
         """
-        if not isinstance(filename, str):
-            filename = str(filename)
         self.get_image(filename, format, overwrite)
 
     def set_text(self, text: str):
@@ -114,7 +135,7 @@ class Pasteboard:
         """
         self.pasteboard.clearContents()
         self.pasteboard.setString_forType_(text, NSPasteboardTypeString)
-        self._change_count = self.pasteboard.changeCount()
+        self._change_count = self._pasteboard_change_count()
 
     def get_text(self) -> str:
         """Return text from clipboard
@@ -138,19 +159,34 @@ class Pasteboard:
 
         Raises:
             FileExistsError: If file exists and overwrite is False
-            PasteboardTypeError: If format is not "PNG" or "TIFF"
+            PasteboardTypeError: If format is not "PNG" or "TIFF" or clipboard does not contain
+                image in the specified format
+            OSError: If the image could not be written to filename
         """
-        if format not in (PNG, TIFF):
-            raise PasteboardTypeError("Invalid format, must be PNG or TIFF")
-
-        if not isinstance(filename, str):
-            filename = str(filename)
-
-        if not overwrite and os.path.exists(filename):
-            raise FileExistsError(f"File '{filename}' already exists")
-
-        data = self.get_image_data(format)
-        data.writeToFile_atomically_(filename, True)
+        filename = os.fspath(filename)
+
+        with autorelease_pool():
+            data = self.get_image_data(format)
+            if data is None:
+                # check before touching the file system so no empty file is left behind
+                raise PasteboardTypeError(f"Clipboard does not contain {format} image")
+            if overwrite:
+                # write to a temporary file and rename it so an existing file is never left half written
+                ok, error = data.writeToFile_options_error_(
+                    filename, NSDataWritingAtomic, None
+                )
+                if not ok:
+                    raise OSError(f"Could not write image to '{filename}': {error}")
+                return
+
+            # the buffer is taken before the file is created so a failure can't leave an empty file;
+            # exclusive create checks that the file doesn't exist and creates it in one step
+            try:
+                with memoryview(data) as buffer, open(filename, "xb") as f:
+                    # NSData supports the buffer protocol so this writes its bytes without copying them
+                    f.write(buffer)
+            except FileExistsError as e:
+                raise FileExistsError(f"File '{filename}' already exists") from e
 
     def set_image(self, filename: t.Union[str, os.PathLike], format: str):
         """Set image on clipboard from file in either PNG or TIFF format
@@ -159,10 +195,10 @@ class Pasteboard:
             filename (os.PathLike): Filename of image to set on clipboard
             format (str): Format of image to set, "PNG" or "TIFF"
         """
-        if not isinstance(filename, str):
-            filename = str(filename)
-        data = NSData.dataWithContentsOfFile_(filename)
-        self.set_image_data(data, format)
+        filename = os.fspath(filename)
+        with autorelease_pool():
+            data = _mapped_file_data(filename)
+            self.set_image_data(data, _image_format(data, format))
 
     def get_image_data(self, format: str) -> NSData:
         """Return image data from clipboard as NSData in PNG or TIFF format
@@ -175,11 +211,8 @@ class Pasteboard:
         Raises:
             PasteboardTypeError if clipboard does not contain image in the specified type or type is invalid
         """
-        if format not in (PNG, TIFF):
-            raise PasteboardTypeError("Invalid format, must be PNG or TIFF")
-
-        pb_type = NSPasteboardTypePNG if format == PNG else NSPasteboardTypeTIFF
-        if pb_type == NSPasteboardTypePNG and not self._has_png():
+        pb_type = _pasteboard_type(format)
+        if format == PNG and not self._has_png():
             raise PasteboardTypeError("Clipboard does not contain PNG image")
         return self.pasteboard.dataForType_(pb_type)
 
@@ -192,13 +225,10 @@ class Pasteboard:
 
         Raises: PasteboardTypeError if format is not "PNG" or "TIFF"
         """
-        if format not in (PNG, TIFF):
-            raise PasteboardTypeError("Invalid format, must be PNG or TIFF")
-
-        format_type = NSPasteboardTypePNG if format == PNG else NSPasteboardTypeTIFF
+        format_type = _pasteboard_type(format)
         self.pasteboard.clearContents()
         self.pasteboard.setData_forType_(image_data, format_type)
-        self._change_count = self.pasteboard.changeCount()
+        self._change_count = self._pasteboard_change_count()
 
     def set_text_and_image(
         self, text: str, filename: t.Union[str, os.PathLike], format: str
@@ -210,10 +240,10 @@ class Pasteboard:
             filename (os.PathLike): Filename of image to set on clipboard
             format (str): Format of image to set, "PNG" or "TIFF"
         """
-        if not isinstance(filename, str):
-            filename = str(filename)
-        data = NSData.dataWithContentsOfFile_(filename)
-        self.set_text_and_image_data(text, data, format)
+        filename = os.fspath(filename)
+        with autorelease_pool():
+            data = _mapped_file_data(filename)
+            self.set_text_and_image_data(text, data, _image_format(data, format))
 
     def set_text_and_image_data(self, text: str, image_data: NSData, format: str):
         """Set both text and image data on clipboard from NSData in a supported image format
@@ -225,19 +255,25 @@ class Pasteboard:
 
         Raises: PasteboardTypeError if format is not "PNG" or "TIFF"
         """
-        self.set_image_data(image_data, format)
-        self.pasteboard.setString_forType_(text, NSPasteboardTypeString)
-        self._change_count = self.pasteboard.changeCount()
+        format_type = _pasteboard_type(format)
+        # write both representations as a single item so they're sent to the pasteboard together
+        item = NSPasteboardItem.alloc().init()
+        item.setData_forType_(image_data, format_type)
+        item.setString_forType_(text, NSPasteboardTypeString)
+        self.pasteboard.clearContents()
+        self.pasteboard.writeObjects_([item])
+        self._change_count = self._pasteboard_change_count()
 
     def has_changed(self) -> bool:
         """Return True if clipboard has been changed by another process since last check
 
         Returns: bool
         """
-        if self.pasteboard.changeCount() != self._change_count:
-            self._change_count = self.pasteboard.changeCount()
-            return True
-        return False
+        change_count = self._pasteboard_change_count()
+        if change_count == self._change_count:
+            return False
+        self._change_count = change_count
+        return True
 
     def has_image(self, format: t.Optional[str] = None) -> bool:
         """Return True if clipboard has image otherwise False
@@ -252,9 +288,7 @@ class Pasteboard:
             PasteboardTypeError if format is not "PNG" or "TIFF"
         """
         if format is None:
-            return self.pasteboard.types().containsObject_(
-                NSPasteboardTypeTIFF
-            ) or self.pasteboard.types().containsObject_(NSPasteboardTypePNG)
+            return bool(self.pasteboard.availableTypeFromArray_(_IMAGE_TYPES))
         elif format == PNG:
             return self._has_png()
         elif format == TIFF:
@@ -269,16 +303,67 @@ class Pasteboard:
         """
         return self.pasteboard.types().containsObject_(NSPasteboardTypeString)
 
+    def peek(self) -> t.Tuple[bool, bool, bool]:
+        """Return which of text, PNG image, and TIFF image the clipboard has
+
+        This gets the clipboard's types once so is faster than calling has_text() and has_image()
+
+        Returns: tuple of bools (has_text, has_png, has_tiff)
+        """
+        types = set(self.pasteboard.types() or ())
+        return (
+            NSPasteboardTypeString in types,
+            NSPasteboardTypePNG in types,
+            NSPasteboardTypeTIFF in types,
+        )
+
     def _has_png(self) -> bool:
         """Return True if clipboard can paste PNG image otherwise False
 
         Returns: bool
         """
-        return bool(self.pasteboard.availableTypeFromArray_([NSPasteboardTypePNG]))
+        return bool(self.pasteboard.availableTypeFromArray_(_PNG_TYPES))
 
     def _has_tiff(self) -> bool:
         """Return True if clipboard can paste TIFF image otherwise False
 
         Returns: bool
         """
-        return bool(self.pasteboard.availableTypeFromArray_([NSPasteboardTypeTIFF]))
+        return bool(self.pasteboard.availableTypeFromArray_(_TIFF_TYPES))
+
+
+def _mapped_file_data(filename: str) -> t.Optional[NSData]:
+    """Return the contents of filename as NSData that is memory mapped if it's safe to do so,
+    or None if the file can't be read"""
+    # mapping the file avoids reading the whole image into memory before copying it to the pasteboard
+    data, _ = NSData.dataWithContentsOfFile_options_error_(
+        filename, NSDataReadingMappedIfSafe, None
+    )
+    return data
+
+
+def _pasteboard_type(format: str) -> str:
+    """Return the NSPasteboardType for image format
+
+    Raises:
+        PasteboardTypeError if format is not "PNG" or "TIFF"
+    """
+    try:
+        return _FORMAT_TYPES[format]
+    except KeyError:
+        raise PasteboardTypeError("Invalid format, must be PNG or TIFF") from None
+
+
+def _image_format(data: t.Optional[NSData], format: str) -> str:
+    """Return PNG if format is TIFF but data is a PNG image, otherwise format
+
+    PNG data labeled as TIFF can't be read as TIFF, so the PNG is put on the clipboard
+    as PNG instead of converting it to a (much larger) TIFF.
+    """
+    if (
+        format == TIFF
+        and data is not None
+        and memoryview(data)[: len(_PNG_SIGNATURE)] == _PNG_SIGNATURE
+    ):
+        return PNG
+    return format